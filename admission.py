@@ -0,0 +1,131 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator
+
+from profiling import timed
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+PRIORITIES = (INTERACTIVE, BULK)
+
+
+class Saturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"服务繁忙，请在 {retry_after} 秒后重试")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float,
+                 bulk_queue_ratio: float = 0.5):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.bulk_queue_limit = int(max_queue * bulk_queue_ratio)
+        self.active = 0
+        # 每个优先级下按平台分队列，出队时在平台间轮转，避免单一平台的突发流量占满
+        self._queues: Dict[str, "OrderedDict[str, deque]"] = {p: OrderedDict() for p in PRIORITIES}
+        self._queued = {p: 0 for p in PRIORITIES}
+        self.avg_service_time = 1.0
+        self.admitted = {p: 0 for p in PRIORITIES}
+        self.rejected = {p: 0 for p in PRIORITIES}
+
+    @property
+    def queued(self) -> int:
+        return sum(self._queued.values())
+
+    def retry_after(self) -> int:
+        backlog = self.queued + 1
+        return max(1, math.ceil(backlog * self.avg_service_time / max(self.max_concurrency, 1)))
+
+    @asynccontextmanager
+    async def slot(self, priority: str, platform: str) -> AsyncIterator[None]:
+        with timed('queue'):
+            await self.acquire(priority, platform)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.avg_service_time += 0.1 * (time.perf_counter() - start - self.avg_service_time)
+            self.release()
+
+    async def acquire(self, priority: str, platform: str) -> None:
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self.admitted[priority] += 1
+            return
+
+        limit = self.max_queue if priority == INTERACTIVE else self.bulk_queue_limit
+        if self.queued >= limit:
+            self.rejected[priority] += 1
+            raise Saturated(self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority].setdefault(platform, deque())
+        queue.append(waiter)
+        self._queued[priority] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 已经分配到执行槽位但调用方放弃了，归还槽位
+                self.release()
+            else:
+                waiter.cancel()
+                self._remove(priority, platform, waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected[priority] += 1
+                raise Saturated(self.retry_after())
+            raise
+        self.admitted[priority] += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        while self.active < self.max_concurrency:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            if waiter.done():
+                continue
+            self.active += 1
+            waiter.set_result(None)
+
+    def _next_waiter(self):
+        for priority in PRIORITIES:
+            queues = self._queues[priority]
+            if not queues:
+                continue
+            platform, queue = next(iter(queues.items()))
+            waiter = queue.popleft()
+            self._queued[priority] -= 1
+            del queues[platform]
+            if queue:
+                queues[platform] = queue
+            return waiter
+        return None
+
+    def _remove(self, priority: str, platform: str, waiter) -> None:
+        queues = self._queues[priority]
+        queue = queues.get(platform)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        self._queued[priority] -= 1
+        if not queue:
+            del queues[platform]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'active': self.active,
+            'max_concurrency': self.max_concurrency,
+            'queued': dict(self._queued),
+            'admitted': dict(self.admitted),
+            'rejected': dict(self.rejected),
+            'avg_service_ms': round(self.avg_service_time * 1000, 1),
+        }
@@ -0,0 +1,161 @@
+"""对比B站解析结果用嵌套字典与 msgspec 结构体两种表示时的构建、序列化耗时和缓存内存占用。
+
+    python benchmarks/bench_models.py
+
+两边输出相同的 JSON 字节：字典用 json.dumps（紧凑分隔符、不转义中文）序列化，结构体用 encode_json，
+不包含原先 FastAPI response_model 校验和 jsonable_encoder 的开销。
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import ParseResult
+from parsers.models import (
+    BilibiliOwner,
+    BilibiliPage,
+    BilibiliResult,
+    BilibiliStatistics,
+    encode_json,
+)
+
+ROUNDS = 20000
+REPEAT = 5
+CACHED = 5000
+
+VIDEO_DATA = {
+    'bvid': 'BV1xx411c7mD',
+    'aid': 170001,
+    'title': '视频标题' * 4,
+    'desc': '视频简介' * 20,
+    'pic': 'http://i0.hdslb.com/bfs/archive/cover.jpg',
+    'owner': {'mid': 123456, 'name': 'UP主', 'face': 'http://i0.hdslb.com/bfs/face/face.jpg'},
+    'duration': 600,
+    'pubdate': 1700000000,
+    'stat': {'view': 100000, 'danmaku': 500, 'reply': 300, 'favorite': 2000, 'coin': 800, 'share': 100, 'like': 9000},
+    'pages': [{'cid': 1000 + i, 'page': i + 1, 'part': f'P{i + 1}', 'duration': 60} for i in range(3)],
+}
+
+
+def build_dict(video_data):
+    result = {
+        'bvid': video_data.get('bvid'),
+        'aid': video_data.get('aid'),
+        'title': video_data.get('title', ''),
+        'desc': video_data.get('desc', ''),
+        'pic': video_data.get('pic', ''),
+        'owner': {
+            'mid': video_data.get('owner', {}).get('mid'),
+            'name': video_data.get('owner', {}).get('name', ''),
+            'face': video_data.get('owner', {}).get('face', ''),
+        },
+        'duration': video_data.get('duration'),
+        'pubdate': video_data.get('pubdate'),
+        'statistics': {
+            'view': video_data.get('stat', {}).get('view', 0),
+            'danmaku': video_data.get('stat', {}).get('danmaku', 0),
+            'reply': video_data.get('stat', {}).get('reply', 0),
+            'favorite': video_data.get('stat', {}).get('favorite', 0),
+            'coin': video_data.get('stat', {}).get('coin', 0),
+            'share': video_data.get('stat', {}).get('share', 0),
+            'like': video_data.get('stat', {}).get('like', 0),
+        },
+        'pages': [],
+        'video_url': None,
+    }
+    pages = video_data.get('pages', [])
+    if pages:
+        result['pages'] = [
+            {
+                'cid': page.get('cid'),
+                'page': page.get('page'),
+                'part': page.get('part', ''),
+                'duration': page.get('duration'),
+            }
+            for page in pages
+        ]
+    return result
+
+
+def build_struct(video_data):
+    owner = video_data.get('owner', {})
+    stat = video_data.get('stat', {})
+    return BilibiliResult(
+        bvid=video_data.get('bvid'),
+        aid=video_data.get('aid'),
+        title=video_data.get('title', ''),
+        desc=video_data.get('desc', ''),
+        pic=video_data.get('pic', ''),
+        owner=BilibiliOwner(
+            mid=owner.get('mid'),
+            name=owner.get('name', ''),
+            face=owner.get('face', ''),
+        ),
+        duration=video_data.get('duration'),
+        pubdate=video_data.get('pubdate'),
+        statistics=BilibiliStatistics(
+            view=stat.get('view', 0),
+            danmaku=stat.get('danmaku', 0),
+            reply=stat.get('reply', 0),
+            favorite=stat.get('favorite', 0),
+            coin=stat.get('coin', 0),
+            share=stat.get('share', 0),
+            like=stat.get('like', 0),
+        ),
+        pages=[
+            BilibiliPage(
+                cid=page.get('cid'),
+                page=page.get('page'),
+                part=page.get('part', ''),
+                duration=page.get('duration'),
+            )
+            for page in video_data.get('pages', [])
+        ],
+    )
+
+
+def serialize_dict(result):
+    response = {'platform': 'bilibili', 'success': True, 'data': result, 'error': None}
+    return json.dumps(response, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def serialize_struct(result):
+    return encode_json(ParseResult(platform='bilibili', success=True, data=result))
+
+
+def measure(func, *args):
+    # 取多轮中的最小值，减少同机其他负载带来的噪声
+    return min(timeit.repeat(lambda: func(*args), number=ROUNDS, repeat=REPEAT)) / ROUNDS * 1e6
+
+
+def cached_size(builder):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    results = [builder(VIDEO_DATA) for _ in range(CACHED)]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del results
+    return size / CACHED
+
+
+def main():
+    assert serialize_dict(build_dict(VIDEO_DATA)) == serialize_struct(build_struct(VIDEO_DATA))
+
+    build = ('构建 (us)', measure(build_dict, VIDEO_DATA), measure(build_struct, VIDEO_DATA))
+    serialize = ('序列化 (us)', measure(serialize_dict, build_dict(VIDEO_DATA)), measure(serialize_struct, build_struct(VIDEO_DATA)))
+    rows = [
+        build,
+        serialize,
+        ('构建+序列化 (us)', build[1] + serialize[1], build[2] + serialize[2]),
+        ('单条缓存内存 (B)', cached_size(build_dict), cached_size(build_struct)),
+    ]
+    print(f"{'':<18}{'dict':>12}{'struct':>12}{'提升':>10}")
+    for name, legacy, struct in rows:
+        print(f"{name:<18}{legacy:>12.1f}{struct:>12.1f}{legacy / struct:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""对比声明式提取规则编译出的函数与原先手写提取代码的耗时（抖音、B站）。
+
+    python benchmarks/bench_specs.py
+
+"完整" 包含标记匹配、解码和字段映射；"字段映射" 使用预先解码好的数据，只比较取值和构建结果的部分。
+"""
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsers import specs
+from parsers.models import (
+    BilibiliOwner,
+    BilibiliPage,
+    BilibiliResult,
+    BilibiliStatistics,
+    DouyinAuthor,
+    DouyinBitrate,
+    DouyinMusic,
+    DouyinResult,
+    DouyinStatistics,
+    DouyinVideo,
+    to_builtins,
+)
+
+ROUNDS = 2000
+REPEAT = 40
+
+AWEME_DETAIL = {
+    'awemeId': '7300000000000000000',
+    'desc': '视频描述' * 10,
+    'author': {'nickname': '作者', 'uid': '1001', 'avatarThumb': {'urlList': ['http://p3.douyinpic.com/avatar.jpeg']}},
+    'stats': {'diggCount': 1000, 'commentCount': 100, 'shareCount': 10},
+    'video': {
+        'duration': 15000,
+        'width': 1080,
+        'height': 1920,
+        'ratio': '1080p',
+        'cover': {'urlList': ['http://p3.douyinpic.com/cover.jpeg']},
+        'dynamicCover': {'urlList': ['http://p3.douyinpic.com/dynamic.webp']},
+        'playAddr': [{'src': 'http://v26.douyinvod.com/play.mp4'}],
+        'bitRateList': [
+            {'bitRate': 1000000 * i, 'gearName': f'gear_{i}', 'playAddr': [{'src': f'http://v26.douyinvod.com/{i}.mp4'}]}
+            for i in range(4)
+        ],
+    },
+    'music': {'title': '原声', 'authorName': '作者', 'playUrl': {'uri': 'http://music.mp3'}},
+}
+DOUYIN_DATA = {'app': {'videoDetail': AWEME_DETAIL}}
+DOUYIN_HTML = (
+    '<html><script id="RENDER_DATA" type="application/json">'
+    + urllib.parse.quote(json.dumps(DOUYIN_DATA, ensure_ascii=False))
+    + '</script></html>'
+)
+
+BILIBILI_DATA = {'videoData': {
+    'bvid': 'BV1xx411c7mD',
+    'aid': 170001,
+    'title': '视频标题' * 4,
+    'desc': '视频简介' * 20,
+    'pic': 'http://i0.hdslb.com/bfs/archive/cover.jpg',
+    'owner': {'mid': 123456, 'name': 'UP主', 'face': 'http://i0.hdslb.com/bfs/face/face.jpg'},
+    'duration': 600,
+    'pubdate': 1700000000,
+    'stat': {'view': 100000, 'danmaku': 500, 'reply': 300, 'favorite': 2000, 'coin': 800, 'share': 100, 'like': 9000},
+    'pages': [{'cid': 1000 + i, 'page': i + 1, 'part': f'P{i + 1}', 'duration': 60} for i in range(3)],
+}}
+BILIBILI_HTML = '<script>window.__INITIAL_STATE__=' + json.dumps(BILIBILI_DATA, ensure_ascii=False) + ';</script>'
+
+
+# 以下两个函数是改为声明式规则之前的手写提取代码，decode 为解码函数
+def handwritten_douyin(html, decode):
+    match = re.search(r'<script id="RENDER_DATA" type="application/json">([^<]+)</script>', html)
+    if not match:
+        return None
+    data = decode(match.group(1))
+    aweme_detail = None
+    if isinstance(data, dict):
+        if 'app' in data and isinstance(data['app'], dict):
+            if 'videoDetail' in data['app']:
+                aweme_detail = data['app']['videoDetail']
+            elif 'aweme' in data['app']:
+                aweme_detail = data['app']['aweme'].get('detail')
+    if not aweme_detail:
+        return None
+
+    video_info = aweme_detail.get('video', {})
+    author_info = aweme_detail.get('author', {})
+    stats = aweme_detail.get('stats', {})
+    music = aweme_detail.get('music', {})
+    result = DouyinResult(
+        aweme_id=aweme_detail.get('awemeId'),
+        title=aweme_detail.get('desc', ''),
+        author=DouyinAuthor(
+            nickname=author_info.get('nickname', ''),
+            uid=author_info.get('uid', ''),
+            avatar=author_info.get('avatarThumb', ''),
+        ),
+        statistics=DouyinStatistics(
+            digg_count=stats.get('diggCount', 0),
+            comment_count=stats.get('commentCount', 0),
+            share_count=stats.get('shareCount', 0),
+        ),
+        video=DouyinVideo(
+            duration=video_info.get('duration'),
+            width=video_info.get('width'),
+            height=video_info.get('height'),
+            ratio=video_info.get('ratio'),
+            cover=video_info.get('cover', ''),
+            dynamic_cover=video_info.get('dynamicCover', ''),
+        ),
+        music=DouyinMusic(
+            title=music.get('title', ''),
+            author=music.get('authorName', ''),
+            url=music.get('playUrl', ''),
+        ),
+    )
+    play_addr = video_info.get('playAddr')
+    if play_addr:
+        if isinstance(play_addr, list) and len(play_addr) > 0:
+            if isinstance(play_addr[0], dict) and 'src' in play_addr[0]:
+                result.video_url = play_addr[0]['src']
+            elif isinstance(play_addr[0], str):
+                result.video_url = play_addr[0]
+        elif isinstance(play_addr, dict):
+            url_list = play_addr.get('urlList', [])
+            if url_list:
+                result.video_url = url_list[0]
+    bit_rate_list = video_info.get('bitRateList', [])
+    if bit_rate_list:
+        result.video.bitrate_urls = []
+        for item in bit_rate_list:
+            if isinstance(item, dict):
+                play_addr_item = item.get('playAddr')
+                url = None
+                if isinstance(play_addr_item, list) and len(play_addr_item) > 0:
+                    url = play_addr_item[0].get('src') if isinstance(play_addr_item[0], dict) else play_addr_item[0]
+                elif isinstance(play_addr_item, dict):
+                    url_list = play_addr_item.get('urlList', [])
+                    url = url_list[0] if url_list else None
+                result.video.bitrate_urls.append(DouyinBitrate(
+                    bit_rate=item.get('bitRate'),
+                    gear_name=item.get('gearName'),
+                    url=url
+                ))
+    return result
+
+
+def handwritten_bilibili(html, decode):
+    match = re.search(r'window\.__INITIAL_STATE__\s*=\s*({.*?});', html, re.DOTALL)
+    if not match:
+        return None
+    data = decode(match.group(1))
+    video_data = data.get('videoData', {})
+    if not video_data:
+        return None
+    owner = video_data.get('owner', {})
+    stat = video_data.get('stat', {})
+    return BilibiliResult(
+        bvid=video_data.get('bvid'),
+        aid=video_data.get('aid'),
+        title=video_data.get('title', ''),
+        desc=video_data.get('desc', ''),
+        pic=video_data.get('pic', ''),
+        owner=BilibiliOwner(
+            mid=owner.get('mid'),
+            name=owner.get('name', ''),
+            face=owner.get('face', ''),
+        ),
+        duration=video_data.get('duration'),
+        pubdate=video_data.get('pubdate'),
+        statistics=BilibiliStatistics(
+            view=stat.get('view', 0),
+            danmaku=stat.get('danmaku', 0),
+            reply=stat.get('reply', 0),
+            favorite=stat.get('favorite', 0),
+            coin=stat.get('coin', 0),
+            share=stat.get('share', 0),
+            like=stat.get('like', 0),
+        ),
+        pages=[
+            BilibiliPage(
+                cid=page.get('cid'),
+                page=page.get('page'),
+                part=page.get('part', ''),
+                duration=page.get('duration'),
+            )
+            for page in video_data.get('pages', [])
+        ],
+    )
+
+
+def compile_with_decoder(platform, name, decoder):
+    with open(specs.registry.path, encoding='utf-8') as f:
+        raw = json.load(f)
+    spec = next(spec for spec in raw[platform] if spec['name'] == name)
+    return specs.compile_specs({platform: [dict(spec, decoder=decoder)]})[platform][name]
+
+
+def timeit(func, *args):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def compare(legacy, spec):
+    # 交替运行取最小值，减少机器负载波动对结果的影响
+    legacy_times, spec_times = [], []
+    for _ in range(REPEAT):
+        legacy_times.append(timeit(*legacy))
+        spec_times.append(timeit(*spec))
+    return min(legacy_times), min(spec_times)
+
+
+def main():
+    cases = [
+        ('douyin', 'render_data', DOUYIN_HTML, DOUYIN_DATA, handwritten_douyin,
+         lambda text: json.loads(urllib.parse.unquote(text))),
+        ('bilibili', 'initial_state', BILIBILI_HTML, BILIBILI_DATA, handwritten_bilibili, json.loads),
+    ]
+    print(f"{'':<24}{'手写 (us)':>12}{'规则 (us)':>12}{'提升':>10}")
+    for platform, name, html, data, handwritten, decode in cases:
+        compiled = specs.registry.strategy(platform, name)
+        assert to_builtins(compiled(html)) == to_builtins(handwritten(html, decode))
+
+        specs.DECODERS['predecoded'] = lambda text, data=data: data
+        walk_only = compile_with_decoder(platform, name, 'predecoded')
+        predecoded = lambda text, data=data: data
+
+        rows = [
+            (f'{platform} 完整', *compare((handwritten, html, decode), (compiled, html))),
+            (f'{platform} 字段映射', *compare((handwritten, html, predecoded), (walk_only, html))),
+        ]
+        for label, legacy, spec in rows:
+            print(f"{label:<24}{legacy:>12.2f}{spec:>12.2f}{legacy / spec:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Worker 冷启动耗时报告：各依赖的导入耗时（python -X importtime）以及启动时间与预算的对比。
+
+    python benchmarks/bench_startup.py
+
+"框架" 为 FastAPI / pydantic-settings 本身的导入耗时，"应用" 为在框架已导入的前提下导入 main 的耗时，
+后者即 tests/test_startup.py 检查的启动预算（STARTUP_BUDGET_MS，默认 200ms）。
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+TOP = 15
+
+FRAMEWORK = 'import fastapi, fastapi.responses, fastapi.middleware.cors, pydantic, pydantic_settings'
+MEASURE = f"""
+import time
+start = time.perf_counter()
+{FRAMEWORK}
+framework = time.perf_counter()
+import main
+done = time.perf_counter()
+print((framework - start) * 1000, (done - framework) * 1000)
+"""
+
+
+def run(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def import_times():
+    # importtime 输出: "import time: self [us] | cumulative | imported package"，缩进表示嵌套层级
+    stderr = run('-X', 'importtime', '-c', 'import main').stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def main():
+    rows = import_times()
+    # 子模块先于父模块输出：从 main 往前找，直到遇到同级或更上层的模块为止
+    index = next(i for i, row in enumerate(rows) if row[0] == 'main')
+    direct = []
+    for row in reversed(rows[:index]):
+        if row[1] <= rows[index][1]:
+            break
+        if row[1] == rows[index][1] + 1:
+            direct.append(row)
+    print(f"main 直接导入的模块（累计耗时前 {TOP}）")
+    for name, _, _, cumulative in sorted(direct, key=lambda row: row[3], reverse=True)[:TOP]:
+        print(f"  {name:<32}{cumulative:>10.1f} ms")
+
+    project = [row for row in rows if row[0].split('.')[0] in {
+        'main', 'config', 'cache', 'admission', 'memory', 'profiling', 'zipstream', 'utils', 'parsers',
+    }]
+    print("本项目模块自身耗时")
+    for name, _, self_ms, _ in sorted(project, key=lambda row: row[2], reverse=True):
+        print(f"  {name:<32}{self_ms:>10.1f} ms")
+
+    framework, application, total = [], [], []
+    for _ in range(RUNS):
+        framework_ms, application_ms = map(float, run('-c', MEASURE).stdout.split())
+        framework.append(framework_ms)
+        application.append(application_ms)
+        total.append(framework_ms + application_ms)
+    budget = float(os.environ.get('STARTUP_BUDGET_MS', '200'))
+    print(f"启动耗时（{RUNS} 次中位数）")
+    print(f"  {'框架':<30}{statistics.median(framework):>10.1f} ms")
+    print(f"  {'应用':<30}{statistics.median(application):>10.1f} ms  (预算 {budget:.0f} ms)")
+    print(f"  {'合计':<30}{statistics.median(total):>10.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
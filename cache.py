@@ -0,0 +1,312 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+from urllib.parse import urlparse, parse_qs
+
+from admission import Saturated
+from parsers.models import Struct
+from utils import UrlUtils
+
+logger = logging.getLogger(__name__)
+
+# 签名视频地址中表示过期时间(unix时间戳)的查询参数: B站durl为deadline, 抖音/字节CDN为x-expires
+EXPIRY_PARAMS = ('deadline', 'x-expires', 'expires')
+
+
+def cache_key(platform: str, url: str) -> str:
+    video_id = UrlUtils.extract_video_id(url, platform)
+    if video_id:
+        return f"{platform}:{video_id}"
+    return f"{platform}:{UrlUtils.clean_url(url)}"
+
+
+def url_expires_at(video_url: Optional[str]) -> Optional[float]:
+    if not video_url:
+        return None
+    query = parse_qs(urlparse(video_url).query)
+    for param in EXPIRY_PARAMS:
+        values = query.get(param)
+        if not values:
+            continue
+        try:
+            timestamp = float(values[0])
+        except ValueError:
+            continue
+        if timestamp > 1e9:
+            return timestamp
+    return None
+
+
+@dataclass
+class CacheEntry:
+    platform: str
+    url: str
+    value: Struct
+    created_at: float
+    expires_at: float
+    score: float = 0.0
+    last_access: float = 0.0
+
+    def touch(self, now: float, window: float) -> None:
+        if self.last_access:
+            self.score *= math.exp(-(now - self.last_access) / window)
+        self.score += 1.0
+        self.last_access = now
+
+    def hotness(self, now: float, window: float) -> float:
+        if not self.last_access:
+            return 0.0
+        return self.score * math.exp(-(now - self.last_access) / window)
+
+
+class ResultCache:
+    def __init__(self, ttl: int, max_entries: int, hot_window: int = 300):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hot_window = hot_window
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[CacheEntry]:
+        now = time.time() if now is None else now
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= now:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        entry.touch(now, self.hot_window)
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, platform: str, url: str, value: Struct,
+            now: Optional[float] = None) -> CacheEntry:
+        now = time.time() if now is None else now
+        expires_at = now + self.ttl
+        signed_expiry = url_expires_at(getattr(value, 'video_url', None))
+        if signed_expiry:
+            expires_at = min(expires_at, signed_expiry)
+
+        previous = self._entries.get(key)
+        entry = CacheEntry(
+            platform=platform,
+            url=url,
+            value=value,
+            created_at=now,
+            expires_at=expires_at,
+        )
+        if previous is not None:
+            entry.score = previous.score
+            entry.last_access = previous.last_access
+        else:
+            entry.touch(now, self.hot_window)
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def due_for_refresh(self, refresh_ahead: float, hot_threshold: float,
+                        now: Optional[float] = None) -> List[tuple]:
+        now = time.time() if now is None else now
+        due = []
+        for key, entry in self._entries.items():
+            if entry.expires_at <= now or entry.expires_at - now > refresh_ahead:
+                continue
+            hotness = entry.hotness(now, self.hot_window)
+            if hotness >= hot_threshold:
+                due.append((hotness, key, entry))
+        due.sort(key=lambda item: item[0], reverse=True)
+        return [(key, entry) for _, key, entry in due]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+
+def failure_kind(error: Exception) -> str:
+    # 解析器抛出这些异常时对应模块必然已经导入，这里不在模块级导入以免拖慢启动
+    import httpx
+    from parsers.douyin_session import ChallengePage
+    
+    if isinstance(error, ChallengePage):
+        return TRANSIENT
+    if isinstance(error, httpx.HTTPStatusError):
+        if error.response.status_code in (404, 410):
+            return PERMANENT
+        return TRANSIENT
+    if isinstance(error, httpx.TransportError):
+        return TRANSIENT
+    return PERMANENT
+
+
+@dataclass
+class NegativeEntry:
+    kind: str
+    error: str
+    expires_at: float
+
+
+class NegativeCache:
+    def __init__(self, transient_ttl: int, permanent_ttl: int, max_entries: int):
+        self.ttls = {TRANSIENT: transient_ttl, PERMANENT: permanent_ttl}
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, NegativeEntry]" = OrderedDict()
+        self.hits = {TRANSIENT: 0, PERMANENT: 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[NegativeEntry]:
+        now = time.time() if now is None else now
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        self.hits[entry.kind] += 1
+        return entry
+
+    def set(self, key: str, kind: str, error: str, now: Optional[float] = None) -> None:
+        ttl = self.ttls[kind]
+        if ttl <= 0:
+            return
+        now = time.time() if now is None else now
+        self._entries[key] = NegativeEntry(kind=kind, error=error, expires_at=now + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'entries': len(self._entries),
+            'transient_hits': self.hits[TRANSIENT],
+            'permanent_hits': self.hits[PERMANENT],
+        }
+
+
+class UpstreamBudget:
+    def __init__(self, per_minute: int):
+        self.capacity = float(max(per_minute, 0))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+class BackgroundRefresher:
+    def __init__(
+        self,
+        cache: ResultCache,
+        parse_func: Callable[[str, str], Awaitable[Optional[Struct]]],
+        interval: float,
+        refresh_ahead: float,
+        hot_threshold: float,
+        budget_per_minute: int,
+        concurrency: int,
+    ):
+        self.cache = cache
+        self.parse_func = parse_func
+        self.interval = interval
+        self.refresh_ahead = refresh_ahead
+        self.hot_threshold = hot_threshold
+        self.budget = UpstreamBudget(budget_per_minute)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self.refreshed = 0
+        self.failed = 0
+        self.skipped_budget = 0
+        self.skipped_saturated = 0
+
+    def start(self) -> None:
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = list(self._inflight.values())
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+            self._loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._inflight.clear()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.refresh_due()
+            except Exception as e:
+                logger.error(f"后台刷新调度失败: {str(e)}", exc_info=True)
+
+    def refresh_due(self) -> List[asyncio.Task]:
+        scheduled = []
+        for key, entry in self.cache.due_for_refresh(self.refresh_ahead, self.hot_threshold):
+            if key in self._inflight:
+                continue
+            if not self.budget.try_acquire():
+                self.skipped_budget += 1
+                break
+            task = asyncio.create_task(self._refresh(key, entry))
+            self._inflight[key] = task
+            scheduled.append(task)
+        return scheduled
+
+    async def _refresh(self, key: str, entry: CacheEntry) -> None:
+        try:
+            async with self._semaphore:
+                result = await self.parse_func(entry.platform, entry.url)
+            if result:
+                self.cache.set(key, entry.platform, entry.url, result)
+                self.refreshed += 1
+            else:
+                self.failed += 1
+        except asyncio.CancelledError:
+            raise
+        except Saturated:
+            # 上游并发已满时让位给交互请求，条目仍然有效，等下一轮再刷新
+            self.skipped_saturated += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"后台刷新失败 {key}: {str(e)}")
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'inflight': len(self._inflight),
+            'refreshed': self.refreshed,
+            'failed': self.failed,
+            'skipped_budget': self.skipped_budget,
+            'skipped_saturated': self.skipped_saturated,
+        }
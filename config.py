@@ -17,6 +17,48 @@ class Settings(BaseSettings):
     
     log_level: str = "INFO"
     
+    result_cache_ttl: int = 600
+    result_cache_max_entries: int = 10000
+    
+    negative_cache_transient_ttl: int = 10
+    negative_cache_permanent_ttl: int = 300
+    negative_cache_max_entries: int = 10000
+    unsupported_cache_max_entries: int = 1000
+    
+    refresh_enabled: bool = True
+    refresh_interval: float = 5.0
+    refresh_ahead: int = 60
+    refresh_hot_threshold: float = 3.0
+    refresh_hot_window: int = 300
+    refresh_budget_per_minute: int = 30
+    refresh_concurrency: int = 4
+    
+    profile_token: str = ""
+    profile_dir: str = "profiles"
+    profile_interval: float = 0.001
+    profile_max_count: int = 100
+    
+    max_response_bytes: int = 5 * 1024 * 1024
+    memory_sample_rate: float = 0.01
+    
+    admission_max_concurrency: int = 32
+    admission_max_queue: int = 128
+    admission_queue_timeout: float = 10.0
+    admission_bulk_queue_ratio: float = 0.5
+    
+    export_concurrency: int = 4
+    export_max_connections: int = 16
+    
+    douyin_session_pool_size: int = 4
+    douyin_session_max_challenges: int = 2
+    douyin_session_max_requests: int = 500
+    
+    spec_file: str = ""
+    spec_reload_interval: float = 5.0
+    
+    http_cache_dir: str = "http_cache"
+    http_cache_max_bytes: int = 256 * 1024 * 1024
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,21 +1,56 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, HttpUrl
 from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+from functools import partial
+import importlib
 import logging
+import re
 
-from parsers.xiaohongshu import XiaohongshuParser
-from parsers.douyin import DouyinParser
-from parsers.bilibili import BilibiliParser
-from parsers.kuaishou import KuaishouParser
+from config import settings
+from admission import AdmissionController, Saturated, PRIORITIES, INTERACTIVE, BULK
+from cache import (
+    PERMANENT,
+    BackgroundRefresher,
+    NegativeCache,
+    ResultCache,
+    cache_key,
+    failure_kind,
+)
+from memory import MemoryTracker
+from zipstream import stream_zip
+from profiling import (
+    ProfileStore,
+    SamplingProfiler,
+    collect_timings,
+    describe,
+    profiling_authorized,
+    timed,
+)
+from parsers.http_cache import upstream_cache
+from parsers.models import Struct, encode_json
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.refresh_enabled:
+        refresher.start()
+    yield
+    await refresher.stop()
+    for parser in parsers.values():
+        await parser.close()
+
+
 app = FastAPI(
     title="视频链接解析API",
     description="支持小红书、抖音、B站、快手等平台的视频链接解析",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -38,13 +73,79 @@ class VideoResponse(BaseModel):
     error: Optional[str] = None
 
 
-parsers = {
-    "xiaohongshu": XiaohongshuParser(),
-    "douyin": DouyinParser(),
-    "bilibili": BilibiliParser(),
-    "kuaishou": KuaishouParser(),
+class ParseResult(Struct):
+    platform: str
+    success: bool
+    data: Optional[Struct] = None
+    error: Optional[str] = None
+
+
+PARSER_CLASSES = {
+    "xiaohongshu": ("parsers.xiaohongshu", "XiaohongshuParser"),
+    "douyin": ("parsers.douyin", "DouyinParser"),
+    "bilibili": ("parsers.bilibili", "BilibiliParser"),
+    "kuaishou": ("parsers.kuaishou", "KuaishouParser"),
 }
 
+# 已创建的解析器；解析器模块（连同 httpx、提取规则编译）在该平台第一次被请求时才导入
+parsers: Dict[str, Any] = {}
+
+
+def get_parser(platform: str):
+    parser = parsers.get(platform)
+    if parser is None and platform in PARSER_CLASSES:
+        module_name, class_name = PARSER_CLASSES[platform]
+        parser_class = getattr(importlib.import_module(module_name), class_name)
+        parser = parsers[platform] = parser_class()
+    return parser
+
+
+async def parse_upstream(platform: str, url: str) -> Optional[Struct]:
+    # 后台刷新同样占用上游并发，按 bulk 类别排队，队列已满时抛出 Saturated 由刷新器跳过
+    async with admission.slot(BULK, platform):
+        return await get_parser(platform).parse(url)
+
+
+result_cache = ResultCache(
+    ttl=settings.result_cache_ttl,
+    max_entries=settings.result_cache_max_entries,
+    hot_window=settings.refresh_hot_window,
+)
+
+negative_cache = NegativeCache(
+    transient_ttl=settings.negative_cache_transient_ttl,
+    permanent_ttl=settings.negative_cache_permanent_ttl,
+    max_entries=settings.negative_cache_max_entries,
+)
+
+# 不支持的链接按客户端原样的 URL 记录，放在单独的小容量缓存里，大量垃圾链接不会挤掉平台的失败记录
+unsupported_cache = NegativeCache(
+    transient_ttl=0,
+    permanent_ttl=settings.negative_cache_permanent_ttl,
+    max_entries=settings.unsupported_cache_max_entries,
+)
+
+refresher = BackgroundRefresher(
+    result_cache,
+    parse_upstream,
+    interval=settings.refresh_interval,
+    refresh_ahead=settings.refresh_ahead,
+    hot_threshold=settings.refresh_hot_threshold,
+    budget_per_minute=settings.refresh_budget_per_minute,
+    concurrency=settings.refresh_concurrency,
+)
+
+profile_store = ProfileStore(settings.profile_dir, settings.profile_max_count)
+
+memory_tracker = MemoryTracker(settings.memory_sample_rate)
+
+admission = AdmissionController(
+    max_concurrency=settings.admission_max_concurrency,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout,
+    bulk_queue_ratio=settings.admission_bulk_queue_ratio,
+)
+
 
 def detect_platform(url: str) -> Optional[str]:
     url_lower = url.lower()
@@ -66,7 +167,9 @@ async def root():
         "supported_platforms": ["小红书", "抖音", "B站", "快手"],
         "endpoints": {
             "/parse": "POST - 解析视频链接",
-            "/health": "GET - 健康检查"
+            "/export/xiaohongshu": "GET - 打包下载小红书图文笔记的全部图片(ZIP)",
+            "/health": "GET - 健康检查",
+            "/stats": "GET - 缓存、后台刷新、提取策略与内存统计"
         }
     }
 
@@ -76,37 +179,74 @@ async def health():
     return {"status": "ok"}
 
 
-@app.post("/parse", response_model=VideoResponse)
-async def parse_video(request: VideoRequest):
-    url = request.url
-    
-    platform = detect_platform(url)
+@app.get("/stats")
+async def stats():
+    return {
+        "cache": result_cache.stats(),
+        "negative_cache": negative_cache.stats(),
+        "unsupported_cache": unsupported_cache.stats(),
+        "refresh": refresher.stats(),
+        "memory": memory_tracker.stats(),
+        "admission": admission.stats(),
+        "douyin_sessions": parsers["douyin"].sessions.stats() if "douyin" in parsers else None,
+        "http_cache": upstream_cache.stats(),
+        "strategies": {
+            platform: {
+                "order": parser.strategies.order(),
+                "stats": parser.strategies.stats(),
+            }
+            for platform, parser in parsers.items()
+        },
+    }
+
+
+async def resolve_video(platform: str, parser, url: str, priority: str) -> ParseResult:
+    key = cache_key(platform, url)
+    entry = result_cache.get(key)
+    if entry:
+        describe("cache", "hit")
+        return ParseResult(
+            platform=platform,
+            success=True,
+            data=entry.value
+        )
     
-    if not platform:
-        raise HTTPException(
-            status_code=400,
-            detail="不支持的平台或无效的链接"
+    failure = negative_cache.get(key)
+    if failure:
+        describe("cache", f"negative-{failure.kind}")
+        return ParseResult(
+            platform=platform,
+            success=False,
+            error=failure.error
         )
     
-    parser = parsers.get(platform)
-    if not parser:
+    try:
+        async with admission.slot(priority, platform):
+            return await parse_and_cache(platform, parser, url, key)
+    except Saturated as e:
         raise HTTPException(
-            status_code=500,
-            detail=f"平台 {platform} 的解析器未实现"
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
         )
-    
+
+
+async def parse_and_cache(platform: str, parser, url: str, key: str) -> ParseResult:
     try:
         logger.info(f"正在解析 {platform} 链接: {url}")
-        result = await parser.parse(url)
+        with timed("parse"), memory_tracker.track(platform):
+            result = await parser.parse(url)
         
         if result:
-            return VideoResponse(
+            result_cache.set(key, platform, url, result)
+            return ParseResult(
                 platform=platform,
                 success=True,
                 data=result
             )
         else:
-            return VideoResponse(
+            negative_cache.set(key, PERMANENT, "无法提取视频信息")
+            return ParseResult(
                 platform=platform,
                 success=False,
                 error="无法提取视频信息"
@@ -114,13 +254,135 @@ async def parse_video(request: VideoRequest):
     
     except Exception as e:
         logger.error(f"解析失败: {str(e)}", exc_info=True)
-        return VideoResponse(
+        negative_cache.set(key, failure_kind(e), str(e))
+        return ParseResult(
             platform=platform,
             success=False,
             error=str(e)
         )
 
 
+@app.post("/parse", response_model=VideoResponse)
+async def parse_video(
+    request: VideoRequest,
+    x_profile_token: Optional[str] = Header(None),
+    x_request_class: str = Header(INTERACTIVE),
+):
+    url = request.url
+    
+    if x_request_class not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"无效的请求类别: {x_request_class}"
+        )
+    
+    platform = None
+    if not unsupported_cache.get(url):
+        platform = detect_platform(url)
+        if not platform:
+            unsupported_cache.set(url, PERMANENT, "不支持的平台或无效的链接")
+    
+    if not platform:
+        raise HTTPException(
+            status_code=400,
+            detail="不支持的平台或无效的链接"
+        )
+    
+    parser = get_parser(platform)
+    if not parser:
+        raise HTTPException(
+            status_code=500,
+            detail=f"平台 {platform} 的解析器未实现"
+        )
+    
+    profiler = None
+    if x_profile_token is not None:
+        if not profiling_authorized(x_profile_token, settings.profile_token):
+            raise HTTPException(
+                status_code=403,
+                detail="无权进行性能分析"
+            )
+        profiler = SamplingProfiler(interval=settings.profile_interval)
+        profiler.start()
+    
+    profile_id = None
+    try:
+        with collect_timings() as timings:
+            with timed("total"):
+                video_response = await resolve_video(platform, parser, url, x_request_class)
+    finally:
+        if profiler:
+            profile_id = await profile_store.save(profiler.stop())
+    
+    response = Response(content=encode_json(video_response), media_type="application/json")
+    response.headers["Server-Timing"] = timings.header()
+    if profile_id:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
+
+@app.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    if not profiling_authorized(x_profile_token, settings.profile_token):
+        raise HTTPException(
+            status_code=403,
+            detail="无权查看性能分析结果"
+        )
+    
+    profile = profile_store.load(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=404,
+            detail="性能分析结果不存在"
+        )
+    return profile
+
+
+@app.get("/export/xiaohongshu")
+async def export_xiaohongshu_images(
+    url: str,
+    x_request_class: str = Header(INTERACTIVE),
+):
+    if x_request_class not in PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"无效的请求类别: {x_request_class}"
+        )
+    
+    if detect_platform(url) != "xiaohongshu":
+        raise HTTPException(
+            status_code=400,
+            detail="仅支持小红书笔记链接"
+        )
+    
+    parser = get_parser("xiaohongshu")
+    video_response = await resolve_video("xiaohongshu", parser, url, x_request_class)
+    if not video_response.success:
+        raise HTTPException(
+            status_code=502,
+            detail=video_response.error
+        )
+    
+    data = video_response.data
+    image_urls = [image.url for image in getattr(data, 'images', []) if image.url]
+    if not image_urls:
+        raise HTTPException(
+            status_code=404,
+            detail="该笔记没有图片"
+        )
+    
+    entries = [
+        (parser.image_filename(index, image_url), partial(parser.iter_image, image_url))
+        for index, image_url in enumerate(image_urls, 1)
+    ]
+    filename = re.sub(r'[^A-Za-z0-9_-]', '', getattr(data, 'note_id', None) or '') or 'images'
+    return StreamingResponse(
+        stream_zip(entries, window=settings.export_concurrency),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.zip"'}
+    )
+
+
 @app.get("/platforms")
 async def get_platforms():
     return {
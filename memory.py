@@ -0,0 +1,59 @@
+import random
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+
+
+class PlatformMemory:
+    def __init__(self, window: int = 256):
+        self.samples = 0
+        self.max_peak = 0
+        self.recent: deque = deque(maxlen=window)
+
+    def record(self, peak: int) -> None:
+        self.samples += 1
+        self.max_peak = max(self.max_peak, peak)
+        self.recent.append(peak)
+
+    def stats(self) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        return {
+            'samples': self.samples,
+            'max_peak_bytes': self.max_peak,
+            'avg_peak_bytes': sum(recent) // len(recent) if recent else 0,
+            'p95_peak_bytes': recent[int(len(recent) * 0.95) - 1] if recent else 0,
+        }
+
+
+class MemoryTracker:
+    # tracemalloc 是进程级的，同一时间只采样一个请求；
+    # 并发请求的分配会计入该请求的峰值，因此结果偏保守，适合用于容器规格估算
+    def __init__(self, sample_rate: float):
+        self.sample_rate = sample_rate
+        self.platforms: Dict[str, PlatformMemory] = {}
+        self._active = False
+
+    @contextmanager
+    def track(self, platform: str) -> Iterator[None]:
+        if self._active or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            yield
+            return
+
+        self._active = True
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            if started:
+                tracemalloc.stop()
+            self._active = False
+            self.platforms.setdefault(platform, PlatformMemory()).record(max(peak, 0))
+
+    def stats(self) -> Dict[str, Any]:
+        return {platform: memory.stats() for platform, memory in self.platforms.items()}
@@ -1,13 +1,25 @@
-from .base import BaseParser
-from .xiaohongshu import XiaohongshuParser
-from .douyin import DouyinParser
-from .bilibili import BilibiliParser
-from .kuaishou import KuaishouParser
-
-__all__ = [
-    'BaseParser',
-    'XiaohongshuParser',
-    'DouyinParser',
-    'BilibiliParser',
-    'KuaishouParser',
-]
+import importlib
+
+# 按需导入：导入 parsers 包（例如只用到 parsers.models）时不会连带导入各平台解析器、bs4 和 httpx
+_EXPORTS = {
+    'BaseParser': '.base',
+    'ResponseTooLarge': '.base',
+    'Struct': '.models',
+    'encode_json': '.models',
+    'to_builtins': '.models',
+    'XiaohongshuParser': '.xiaohongshu',
+    'DouyinParser': '.douyin',
+    'BilibiliParser': '.bilibili',
+    'KuaishouParser': '.kuaishou',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -1,10 +1,27 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
 import httpx
 import re
 
+from config import settings
+from profiling import timed
+from .http_cache import UpstreamResponse, upstream_cache
+from .models import Struct
+from .specs import registry as specs
+from .strategy import StrategyChain
+
+
+class ResponseTooLarge(Exception):
+    def __init__(self, url: str, limit: int):
+        super().__init__(f"响应体超过大小限制 ({limit} 字节): {url}")
+        self.url = url
+        self.limit = limit
+
 
 class BaseParser(ABC):
+    # 对应 specs.json 中的平台名，设置后该平台的声明式提取规则注册在完整提取层，排在回退策略之前
+    spec_platform: Optional[str] = None
+    
     def __init__(self):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -13,21 +30,78 @@ class BaseParser(ABC):
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         }
+        self.strategies = StrategyChain()
+        self.max_response_bytes = settings.max_response_bytes
+        self._spec_names = set()
+        self._spec_version = 0
+        self._sync_specs()
     
     @abstractmethod
-    async def parse(self, url: str) -> Optional[Dict[str, Any]]:
+    async def parse(self, url: str) -> Optional[Struct]:
         pass
     
+    async def close(self):
+        pass
+    
+    def _sync_specs(self):
+        self._spec_version = specs.version
+        if not self.spec_platform:
+            return
+        for name in specs.names(self.spec_platform):
+            if name not in self._spec_names:
+                self._spec_names.add(name)
+                self.strategies.register(name, specs.strategy(self.spec_platform, name))
+    
+    def extract(self, html: str) -> Optional[Struct]:
+        specs.maybe_reload()
+        if specs.version != self._spec_version:
+            self._sync_specs()
+        return self.strategies.run(html)
+    
     async def get_redirect_url(self, short_url: str) -> str:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
-            response = await client.get(short_url, headers=self.headers)
-            return str(response.url)
+        with timed('redirect'):
+            async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
+                async with client.stream('GET', short_url, headers=self.headers) as response:
+                    return str(response.url)
     
     async def fetch_page(self, url: str) -> str:
+        with timed('fetch'):
+            response = await self.fetch_cached(url, self.headers)
+        return response.body.decode(response.encoding or 'utf-8', errors='replace')
+    
+    async def fetch_cached(self, url: str, headers: Dict[str, str]) -> UpstreamResponse:
+        return await upstream_cache.fetch(url, headers, self.send)
+    
+    async def send(self, url: str, headers: Dict[str, str]) -> UpstreamResponse:
         async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
-            response = await client.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.text
+            async with client.stream('GET', url, headers=headers) as response:
+                if response.status_code == 304:
+                    return UpstreamResponse(304, response.headers, b'')
+                response.raise_for_status()
+                body = await self.read_limited(response)
+                return UpstreamResponse(response.status_code, response.headers, bytes(body), response.charset_encoding)
+    
+    async def read_limited(self, response: httpx.Response) -> bytearray:
+        limit = self.max_response_bytes
+        content_length = response.headers.get('Content-Length', '')
+        if content_length.isdigit() and int(content_length) > limit:
+            raise ResponseTooLarge(str(response.url), limit)
+        
+        body = bytearray()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > limit:
+                raise ResponseTooLarge(str(response.url), limit)
+        return body
+    
+    async def read_text(self, response: httpx.Response) -> str:
+        body = await self.read_limited(response)
+        return body.decode(response.charset_encoding or 'utf-8', errors='replace')
+    
+    def make_soup(self, html: str):
+        # bs4 只在标题类回退策略里用到，首次使用时再导入
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, 'html.parser')
     
     def extract_json_from_html(self, html: str, pattern: str) -> Optional[str]:
         match = re.search(pattern, html, re.DOTALL)
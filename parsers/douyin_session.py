@@ -0,0 +1,133 @@
+from collections import deque
+from typing import Dict, Any
+import itertools
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 新会话的初始cookie，之后由响应中的 Set-Cookie 覆盖
+SEED_COOKIES = {
+    '__ac_nonce': '0',
+    '__ac_signature': '_',
+}
+
+CHALLENGE_MARKERS = ('byted_acrawler', '__ac_nonce', 'captcha', 'verify-bar')
+
+
+class ChallengePage(Exception):
+    # 反爬验证是暂时性的，换会话或稍后重试通常就能拿到正常页面
+    def __init__(self, url: str):
+        super().__init__(f"抖音返回了反爬验证页面，请稍后重试: {url}")
+        self.url = url
+
+
+def is_challenge_page(html: str) -> bool:
+    if 'RENDER_DATA' in html:
+        return False
+    return any(marker in html for marker in CHALLENGE_MARKERS)
+
+
+class DouyinSession:
+    _ids = itertools.count(1)
+
+    def __init__(self, headers: Dict[str, str], timeout: float):
+        self.id = next(self._ids)
+        self.client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=timeout,
+            headers=headers,
+            cookies=SEED_COOKIES,
+        )
+        self.created_at = time.time()
+        self.requests = 0
+        self.inflight = 0
+        self.consecutive_challenges = 0
+        self.retired = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'age': round(time.time() - self.created_at, 1),
+            'requests': self.requests,
+            'inflight': self.inflight,
+            'consecutive_challenges': self.consecutive_challenges,
+            'cookies': sorted(self.client.cookies.keys()),
+        }
+
+
+class DouyinSessionPool:
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        size: int,
+        max_challenges: int,
+        max_requests: int,
+        timeout: float = 10.0,
+    ):
+        self.headers = headers
+        self.size = max(size, 1)
+        self.max_challenges = max_challenges
+        self.max_requests = max_requests
+        self.timeout = timeout
+        self._sessions: deque = deque()
+        self.created = 0
+        self.retired = 0
+        self.challenges = 0
+
+    def acquire(self) -> DouyinSession:
+        if len(self._sessions) < self.size:
+            session = DouyinSession(self.headers, self.timeout)
+            self.created += 1
+        else:
+            session = self._sessions.popleft()
+        self._sessions.append(session)
+        session.inflight += 1
+        return session
+
+    async def release(self, session: DouyinSession, challenged: bool) -> None:
+        session.inflight -= 1
+        session.requests += 1
+        if challenged:
+            session.consecutive_challenges += 1
+            self.challenges += 1
+        else:
+            session.consecutive_challenges = 0
+
+        if not session.retired and (
+            session.consecutive_challenges >= self.max_challenges
+            or session.requests >= self.max_requests
+        ):
+            self._retire(session)
+
+        if session.retired and session.inflight == 0:
+            await session.client.aclose()
+
+    def _retire(self, session: DouyinSession) -> None:
+        logger.info(
+            f"抖音会话 {session.id} 已停用: 请求 {session.requests} 次, "
+            f"连续验证页 {session.consecutive_challenges} 次"
+        )
+        session.retired = True
+        self.retired += 1
+        try:
+            self._sessions.remove(session)
+        except ValueError:
+            pass
+
+    async def close(self) -> None:
+        sessions = list(self._sessions)
+        self._sessions.clear()
+        for session in sessions:
+            session.retired = True
+            await session.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'created': self.created,
+            'retired': self.retired,
+            'challenges': self.challenges,
+            'sessions': [session.stats() for session in self._sessions],
+        }
@@ -0,0 +1,375 @@
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Callable, Awaitable, Mapping, Tuple
+from urllib.parse import urlparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# 只有正文或只有元数据的文件、未完成的临时文件超过该时长仍未配齐时视为残留并删除
+ORPHAN_GRACE = 60.0
+
+
+@dataclass
+class UpstreamResponse:
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    encoding: Optional[str] = None
+
+
+Send = Callable[[str, Dict[str, str]], Awaitable[UpstreamResponse]]
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in value.split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: float) -> Optional[float]:
+    # 返回 None 表示不允许缓存；0 表示可以缓存但每次都要向上游校验
+    directives = parse_cache_control(headers.get('Cache-Control', ''))
+    if 'no-store' in directives or headers.get('Vary', '').strip() == '*':
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+    if 'max-age' in directives:
+        try:
+            max_age = int(directives['max-age'] or '')
+            age = int(headers.get('Age', '0'))
+        except ValueError:
+            return 0.0
+        return float(max(0, max_age - age))
+    expires = _http_date(headers.get('Expires'))
+    if expires is not None:
+        return max(0.0, expires - (_http_date(headers.get('Date')) or now))
+    return 0.0
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass
+class HttpCacheEntry:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    encoding: Optional[str]
+    expires_at: float
+    size: int
+    stored_size: int
+    stored_at: float
+    # 压缩后正文的摘要；共享目录的多个 worker 交错写入时，正文和元数据可能来自不同的响应
+    digest: str = ''
+
+    def fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+    bytes_fetched: int = 0
+
+    def stats(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['hit_ratio'] = round((self.hits + self.revalidated) / self.requests, 4) if self.requests else 0.0
+        return data
+
+
+class HttpCache:
+    def __init__(self, directory: str, max_bytes: int, compress_level: int = 6, rescan_interval: float = 60.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.rescan_interval = rescan_interval
+        self.stored_bytes = 0
+        self._entries: "OrderedDict[str, HttpCacheEntry]" = OrderedDict()
+        self._hosts: Dict[str, HostStats] = {}
+        self._scanned: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def host_stats(self, url: str) -> HostStats:
+        host = urlparse(url).hostname or ''
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = HostStats()
+        return stats
+
+    async def fetch(self, url: str, headers: Dict[str, str], send: Send) -> UpstreamResponse:
+        if not self.enabled:
+            return await send(url, headers)
+
+        await self._sync_index()
+        stats = self.host_stats(url)
+        stats.requests += 1
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        entry = await self._lookup(key)
+
+        if entry is not None and entry.fresh(time.time()):
+            body = await self._read_body(key, entry)
+            if body is not None:
+                stats.hits += 1
+                stats.bytes_saved += entry.size
+                return UpstreamResponse(200, {}, body, entry.encoding)
+            await self._discard(key)
+            entry = None
+
+        request_headers = dict(headers)
+        if entry is not None:
+            request_headers.update(entry.validators())
+        response = await send(url, request_headers)
+
+        if response.status == 304 and entry is not None:
+            body = await self._read_body(key, entry)
+            if body is not None:
+                stats.revalidated += 1
+                stats.bytes_saved += entry.size
+                await self._refresh(key, entry, response.headers)
+                return UpstreamResponse(200, response.headers, body, entry.encoding)
+            await self._discard(key)
+            response = await send(url, dict(headers))
+
+        stats.misses += 1
+        stats.bytes_fetched += len(response.body)
+        if response.status == 200:
+            await self._store(key, url, response)
+        return response
+
+    async def _sync_index(self) -> None:
+        # 启动后第一次使用时按磁盘上的文件重建索引和总大小，之后定期重新扫描，
+        # 把之前运行留下的以及共享同一目录的其他 worker 写入的条目也计入上限
+        now = time.monotonic()
+        if self._scanned is not None and now - self._scanned < self.rescan_interval:
+            return
+        self._scanned = now
+        started = time.time()
+        try:
+            scanned = await asyncio.to_thread(self._scan)
+        except OSError as e:
+            logger.warning(f"HTTP缓存目录扫描失败: {str(e)}")
+            return
+        # 本进程访问过的条目保持原有的先后顺序，排在只在磁盘上见到的条目之后；
+        # 扫描期间本进程新写入的条目可能没被扫到，直接保留
+        for key, entry in self._entries.items():
+            if key in scanned:
+                scanned.move_to_end(key)
+            elif entry.stored_at >= started:
+                scanned[key] = entry
+        self._entries = scanned
+        self.stored_bytes = sum(entry.stored_size for entry in scanned.values())
+        await self._evict()
+
+    def _scan(self) -> "OrderedDict[str, HttpCacheEntry]":
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return OrderedDict()
+        now = time.time()
+        found = []
+        for name in names:
+            key, suffix = os.path.splitext(name)
+            path = os.path.join(self.directory, name)
+            if suffix == '.json':
+                entry = self._read_meta(key)
+                try:
+                    stored_size = os.path.getsize(self._path(key, '.z'))
+                    written = os.path.getmtime(path)
+                except OSError:
+                    entry = None
+                if entry is not None:
+                    entry.stored_size = stored_size
+                    found.append((written, key, entry))
+                    continue
+            elif suffix == '.z' and os.path.exists(self._path(key, '.json')):
+                continue
+            try:
+                if now - os.path.getmtime(path) > ORPHAN_GRACE:
+                    os.remove(path)
+            except OSError:
+                pass
+        found.sort(key=lambda item: item[0])
+        return OrderedDict((key, entry) for _, key, entry in found)
+
+    async def _lookup(self, key: str) -> Optional[HttpCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        # 内存索引里没有时再看磁盘，服务重启后之前缓存的响应仍然可用
+        entry = await asyncio.to_thread(self._read_meta, key)
+        if entry is not None and key not in self._entries:
+            self._entries[key] = entry
+            self.stored_bytes += entry.stored_size
+            await self._evict()
+        return entry
+
+    async def _refresh(self, key: str, entry: HttpCacheEntry, headers: Mapping[str, str]) -> None:
+        now = time.time()
+        lifetime = freshness_lifetime(headers, now)
+        entry.expires_at = now + (lifetime or 0.0)
+        entry.etag = headers.get('ETag') or entry.etag
+        entry.last_modified = headers.get('Last-Modified') or entry.last_modified
+        try:
+            await asyncio.to_thread(self._write_meta, key, entry)
+        except OSError as e:
+            logger.warning(f"HTTP缓存元数据写入失败: {str(e)}")
+
+    async def _store(self, key: str, url: str, response: UpstreamResponse) -> None:
+        now = time.time()
+        lifetime = freshness_lifetime(response.headers, now)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if lifetime is None or (lifetime <= 0 and not etag and not last_modified):
+            await self._discard(key)
+            return
+
+        try:
+            stored_size, digest = await asyncio.to_thread(self._write_body, key, response.body)
+        except OSError as e:
+            logger.warning(f"HTTP缓存写入失败 {url}: {str(e)}")
+            return
+        entry = HttpCacheEntry(
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            encoding=response.encoding,
+            expires_at=now + lifetime,
+            size=len(response.body),
+            stored_size=stored_size,
+            stored_at=now,
+            digest=digest,
+        )
+        try:
+            await asyncio.to_thread(self._write_meta, key, entry)
+        except OSError as e:
+            logger.warning(f"HTTP缓存写入失败 {url}: {str(e)}")
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.stored_bytes -= previous.stored_size
+        self._entries[key] = entry
+        self.stored_bytes += stored_size
+        await self._evict()
+
+    async def _evict(self) -> None:
+        evicted = []
+        while self.stored_bytes > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self.stored_bytes -= entry.stored_size
+            evicted.append(key)
+        if evicted:
+            await asyncio.to_thread(self._remove_files, evicted)
+
+    async def _discard(self, key: str) -> None:
+        # 磁盘上已有的条目在 _lookup 时都会载入索引，不在索引里就没有文件要删
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.stored_bytes -= entry.stored_size
+            await asyncio.to_thread(self._remove_files, [key])
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def _read_meta(self, key: str) -> Optional[HttpCacheEntry]:
+        try:
+            with open(self._path(key, '.json'), encoding='utf-8') as f:
+                return HttpCacheEntry(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write_meta(self, key: str, entry: HttpCacheEntry) -> None:
+        self._replace(self._path(key, '.json'), json.dumps(asdict(entry)).encode('utf-8'))
+
+    async def _read_body(self, key: str, entry: HttpCacheEntry) -> Optional[bytes]:
+        return await asyncio.to_thread(self._load_body, key, entry.digest)
+
+    def _load_body(self, key: str, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key, '.z'), 'rb') as f:
+                data = f.read()
+            if _digest(data) != digest:
+                return None
+            return zlib.decompress(data)
+        except (OSError, zlib.error):
+            return None
+
+    def _write_body(self, key: str, body: bytes) -> Tuple[int, str]:
+        os.makedirs(self.directory, exist_ok=True)
+        data = zlib.compress(body, self.compress_level)
+        self._replace(self._path(key, '.z'), data)
+        return len(data), _digest(data)
+
+    def _replace(self, path: str, data: bytes) -> None:
+        # 每次写入使用独立的临时文件，多个 worker 同时写同一条目时各自整体替换，不会写进对方的文件
+        fd, temp = tempfile.mkstemp(dir=self.directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)
+        except BaseException:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            raise
+
+    def _remove_files(self, keys) -> None:
+        for key in keys:
+            for suffix in ('.json', '.z'):
+                try:
+                    os.remove(self._path(key, suffix))
+                except OSError:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'stored_bytes': self.stored_bytes,
+            'max_bytes': self.max_bytes,
+            'hosts': {host: stats.stats() for host, stats in self._hosts.items()},
+        }
+
+
+upstream_cache = HttpCache(settings.http_cache_dir, settings.http_cache_max_bytes)
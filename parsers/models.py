@@ -0,0 +1,181 @@
+from typing import Optional, List, Any, Union
+
+import msgspec
+from msgspec import UNSET, UnsetType, field
+
+
+class Struct(msgspec.Struct):
+    # 默认值为 UNSET 的字段在未赋值时不输出，对应原先按条件才写入字典的键
+    pass
+
+
+def to_builtins(value: Any) -> Any:
+    return msgspec.to_builtins(value)
+
+
+_encoder = msgspec.json.Encoder()
+
+
+def encode_json(value: Any) -> bytes:
+    return _encoder.encode(value)
+
+
+class VideoMeta(Struct):
+    duration: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+class Image(Struct):
+    url: str = ''
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+class DouyinAuthor(Struct):
+    nickname: str = ''
+    uid: str = ''
+    avatar: Any = ''
+
+
+class DouyinStatistics(Struct):
+    digg_count: int = 0
+    comment_count: int = 0
+    share_count: int = 0
+
+
+class DouyinBitrate(Struct):
+    bit_rate: Optional[int] = None
+    gear_name: Optional[str] = None
+    url: Optional[str] = None
+
+
+class DouyinVideo(Struct):
+    duration: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    ratio: Optional[str] = None
+    cover: Any = ''
+    dynamic_cover: Any = ''
+    bitrate_urls: Union[List[DouyinBitrate], UnsetType] = UNSET
+
+
+class DouyinMusic(Struct):
+    title: str = ''
+    author: str = ''
+    url: Any = ''
+
+
+class DouyinResult(Struct):
+    aweme_id: Optional[str] = None
+    title: str = ''
+    author: DouyinAuthor = field(default_factory=DouyinAuthor)
+    statistics: DouyinStatistics = field(default_factory=DouyinStatistics)
+    video: DouyinVideo = field(default_factory=DouyinVideo)
+    video_url: Optional[str] = None
+    music: DouyinMusic = field(default_factory=DouyinMusic)
+
+
+class DouyinFallback(Struct):
+    video_url: Optional[str] = None
+    title: str = ''
+
+
+class KuaishouAuthor(Struct):
+    user_id: Optional[str] = None
+    user_name: str = ''
+    user_sex: str = ''
+
+
+class KuaishouStatistics(Struct):
+    view_count: int = 0
+    like_count: int = 0
+    comment_count: int = 0
+
+
+class KuaishouResult(Struct):
+    photo_id: Optional[str] = None
+    caption: str = ''
+    photo_type: Optional[str] = None
+    author: KuaishouAuthor = field(default_factory=KuaishouAuthor)
+    timestamp: Optional[int] = None
+    statistics: KuaishouStatistics = field(default_factory=KuaishouStatistics)
+    video: VideoMeta = field(default_factory=VideoMeta)
+    cover: str = ''
+    video_url: Optional[str] = None
+
+
+class KuaishouSsrResult(Struct):
+    video_url: Optional[str] = None
+    caption: str = ''
+    cover: str = ''
+
+
+class KuaishouFallback(Struct):
+    video_url: Optional[str] = None
+    caption: str = ''
+
+
+class XiaohongshuUser(Struct):
+    nickname: str = ''
+    user_id: str = ''
+
+
+class XiaohongshuResult(Struct):
+    note_id: Optional[str] = None
+    title: str = ''
+    desc: str = ''
+    type: str = ''
+    user: XiaohongshuUser = field(default_factory=XiaohongshuUser)
+    video: VideoMeta = field(default_factory=VideoMeta)
+    images: List[Image] = field(default_factory=list)
+    video_url: Optional[str] = None
+    video_key: Union[str, UnsetType] = UNSET
+
+
+class XiaohongshuFallback(Struct):
+    video_url: Optional[str] = None
+    video_key: Optional[str] = None
+    title: str = ''
+
+
+class BilibiliOwner(Struct):
+    mid: Optional[int] = None
+    name: str = ''
+    face: str = ''
+
+
+class BilibiliStatistics(Struct):
+    view: int = 0
+    danmaku: int = 0
+    reply: int = 0
+    favorite: int = 0
+    coin: int = 0
+    share: int = 0
+    like: int = 0
+
+
+class BilibiliPage(Struct):
+    cid: Optional[int] = None
+    page: Optional[int] = None
+    part: str = ''
+    duration: Optional[int] = None
+
+
+class BilibiliResult(Struct):
+    bvid: Optional[str] = None
+    aid: Optional[int] = None
+    title: str = ''
+    desc: str = ''
+    pic: str = ''
+    owner: BilibiliOwner = field(default_factory=BilibiliOwner)
+    duration: Optional[int] = None
+    pubdate: Optional[int] = None
+    statistics: BilibiliStatistics = field(default_factory=BilibiliStatistics)
+    pages: List[BilibiliPage] = field(default_factory=list)
+    video_url: Optional[str] = None
+
+
+class BilibiliFallback(Struct):
+    title: str = ''
+    video_id: Optional[str] = None
@@ -0,0 +1,332 @@
+from types import MappingProxyType
+from typing import Optional, Dict, Any, List, Callable
+from urllib.parse import unquote
+import json
+import logging
+import os
+import re
+import time
+
+import msgspec
+
+from config import settings
+from . import models
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPEC_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'specs.json')
+
+DECODERS = {
+    'json': json.loads,
+    'uri_json': lambda text: json.loads(unquote(text)),
+}
+
+TRANSFORMS = {
+    'xhs_stream_url': lambda key: key if key.startswith('http') else f"http://sns-video-bd.xhscdn.com/stream/{key}",
+    'xhs_video_key': lambda key: None if key.startswith('http') else key,
+}
+
+TYPES = ('str', 'int', 'float', 'bool', 'dict', 'list')
+
+_EMPTY = MappingProxyType({})
+
+
+class SpecError(Exception):
+    pass
+
+
+def _split_path(path: str) -> tuple:
+    if path in ('', '$'):
+        return ()
+    return tuple(int(part) if part.isdigit() else part for part in path.split('.'))
+
+
+class _Scope:
+    def __init__(self, root: str, is_dict: bool = False):
+        self.root = root
+        self.is_dict = is_dict
+        self.memo: Dict[tuple, str] = {}
+
+    def child(self) -> '_Scope':
+        # 条件分支里的作用域：可以复用外层已求值的变量，分支内新求值的不回写外层
+        scope = _Scope(self.root, self.is_dict)
+        scope.memo = dict(self.memo)
+        return scope
+
+
+class _SpecCompiler:
+    # 把一条规则编译成一段直线式 Python 代码：共同前缀只取一次，运行时不再解释规则
+    def __init__(self, platform: str, name: str):
+        self.label = f"{platform}.{name}"
+        self.namespace: Dict[str, Any] = {'_EMPTY': _EMPTY, '_UNSET': msgspec.UNSET}
+        self.functions: List[str] = []
+        self.counter = 0
+
+    def fail(self, message: str) -> SpecError:
+        return SpecError(f"{self.label}: {message}")
+
+    def var(self) -> str:
+        self.counter += 1
+        return f"_v{self.counter}"
+
+    def const(self, value: Any) -> str:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return repr(value)
+        name = f"_k{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def model(self, name: str):
+        model = getattr(models, name, None)
+        if not (isinstance(model, type) and issubclass(model, models.Struct)):
+            raise self.fail(f"未知的结果模型 {name}")
+        self.namespace[name] = model
+        return model
+
+    def path(self, lines: List[str], scope: _Scope, path: Any, default: Any = None) -> str:
+        segments = _split_path(path) if isinstance(path, str) else path
+        if not segments:
+            return scope.root
+        default_expr = self.const(default)
+        key = ('value', segments, default_expr)
+        if key in scope.memo:
+            return scope.memo[key]
+
+        target = self.var()
+        if '*' in segments:
+            # "*" 依次尝试字典的每个值，取第一个能解析出真值的
+            star = segments.index('*')
+            parent = self.view(lines, scope, segments[:star], dict)
+            item = self.var()
+            body: List[str] = []
+            found = self.path(body, _Scope(item), segments[star + 1:])
+            lines.append(f"{target} = {default_expr}")
+            lines.append(f"for {item} in {parent}.values():")
+            lines.extend(f"    {line}" for line in body)
+            lines.append(f"    if {found}:")
+            lines.append(f"        {target} = {found}")
+            lines.append("        break")
+        elif type(segments[-1]) is int:
+            parent = self.view(lines, scope, segments[:-1], list)
+            index = segments[-1]
+            lines.append(f"{target} = {parent}[{index}] if len({parent}) > {index} else {default_expr}")
+        else:
+            parent = self.view(lines, scope, segments[:-1], dict)
+            if default is None:
+                lines.append(f"{target} = {parent}.get({segments[-1]!r})")
+            else:
+                lines.append(f"{target} = {parent}.get({segments[-1]!r}, {default_expr})")
+        scope.memo[key] = target
+        return target
+
+    def view(self, lines: List[str], scope: _Scope, segments: tuple, kind: type) -> str:
+        # 中间节点只做一次类型检查，类型不符时换成空容器，后续取值不再逐个判断
+        if not segments and scope.is_dict and kind is dict:
+            return scope.root
+        key = ('view', segments, kind)
+        if key in scope.memo:
+            return scope.memo[key]
+        value = self.path(lines, scope, segments)
+        target = self.var()
+        empty = '_EMPTY' if kind is dict else '()'
+        lines.append(f"{target} = {value} if type({value}) is {kind.__name__} else {empty}")
+        scope.memo[key] = target
+        return target
+
+    def field(self, lines: List[str], scope: _Scope, spec: Any) -> str:
+        if isinstance(spec, str):
+            spec = {'path': spec}
+        if not isinstance(spec, dict):
+            raise self.fail(f"无效的字段定义 {spec!r}")
+
+        if 'model' in spec:
+            return self.struct(lines, scope, spec)
+        if 'each' in spec:
+            return self.each(lines, scope, spec)
+
+        paths = spec.get('paths') or [spec.get('path', '')]
+        default = spec.get('default')
+        expected = spec.get('type')
+        if expected is not None and expected not in TYPES:
+            raise self.fail(f"未知的类型 {expected}")
+        transform = spec.get('transform')
+        if transform is not None and transform not in TRANSFORMS:
+            raise self.fail(f"未知的转换 {transform}")
+
+        if len(paths) == 1 and expected is None:
+            target = self.path(lines, scope, paths[0], default)
+        elif ('fallback', tuple(paths), expected, repr(default)) in scope.memo:
+            target = scope.memo[('fallback', tuple(paths), expected, repr(default))]
+        else:
+            # 备选路径按顺序惰性求值，前面的取到真值后不再访问后面的路径
+            target = self.var()
+            scope.memo[('fallback', tuple(paths), expected, repr(default))] = target
+            for index, path in enumerate(paths):
+                block: List[str] = []
+                candidate = self.path(block, scope if index == 0 else scope.child(), path)
+                if expected is not None:
+                    block.append(f"{target} = {candidate} if type({candidate}) is {expected} else None")
+                else:
+                    block.append(f"{target} = {candidate}")
+                if index == 0:
+                    lines.extend(block)
+                else:
+                    lines.append(f"if not {target}:")
+                    lines.extend(f"    {line}" for line in block)
+            lines.append(f"if not {target}:")
+            lines.append(f"    {target} = {self.const(default)}")
+
+        if transform is not None:
+            transformed = self.var()
+            function = self.const(TRANSFORMS[transform])
+            lines.append(f"{transformed} = {function}({target}) if {target} is not None else None")
+            target = transformed
+        return target
+
+    def struct(self, lines: List[str], scope: _Scope, spec: Dict[str, Any]) -> str:
+        model = self.model(spec['model'])
+        if 'root' in spec:
+            scope = _Scope(self.view(lines, scope, _split_path(spec['root']), dict), is_dict=True)
+        fields = spec.get('fields', {})
+        unknown = set(fields) - set(model.__struct_fields__)
+        if unknown:
+            raise self.fail(f"{model.__name__} 没有字段 {', '.join(sorted(unknown))}")
+        # 默认值为 UNSET 的字段取不到值时保持 UNSET，序列化时不输出
+        omitted = {info.name for info in msgspec.structs.fields(model) if info.default is msgspec.UNSET}
+        arguments = []
+        for name, field in fields.items():
+            value = self.field(lines, scope, field)
+            if name in omitted:
+                arguments.append(f"{name}={value} if {value} is not None else _UNSET")
+            else:
+                arguments.append(f"{name}={value}")
+        target = self.var()
+        lines.append(f"{target} = {model.__name__}({', '.join(arguments)})")
+        return target
+
+    def each(self, lines: List[str], scope: _Scope, spec: Dict[str, Any]) -> str:
+        items = self.path(lines, scope, spec.get('path', ''))
+        function = f"_each{len(self.functions)}"
+        self.functions.append(function)
+        body: List[str] = []
+        result = self.struct(body, _Scope('_item', is_dict=True), spec['each'])
+        source = f"def {function}(_item):\n" + ''.join(f"    {line}\n" for line in body) + f"    return {result}\n"
+        exec(compile(source, f"<spec {self.label}>", 'exec'), self.namespace)
+
+        target = self.var()
+        lines.append(f"{target} = [{function}(_i) for _i in {items} if type(_i) is dict] if type({items}) is list else []")
+        if spec.get('omit_empty'):
+            lines.append(f"{target} = {target} or None")
+        return target
+
+    def compile(self, spec: Dict[str, Any]) -> Callable[[str], Optional[models.Struct]]:
+        try:
+            flags = 0
+            for flag in spec.get('flags', []):
+                flags |= getattr(re, flag)
+            self.namespace['_marker'] = re.compile(spec['marker'], flags)
+            self.namespace['_decode'] = DECODERS[spec.get('decoder', 'json')]
+        except (KeyError, AttributeError, re.error) as e:
+            raise self.fail(f"无效的标记或解码器: {str(e)}")
+
+        lines: List[str] = []
+        roots = spec.get('root', '')
+        if isinstance(roots, str):
+            roots = [roots]
+        # 备选根路径依次尝试，前一个命中时后面的（可能要遍历整个字典）不再求值
+        scope = _Scope('_data')
+        for index, root in enumerate(roots):
+            block: List[str] = []
+            candidate = self.path(block, scope if index == 0 else scope.child(), root)
+            block.append(f"_root = {candidate}")
+            if index == 0:
+                lines.extend(block)
+            else:
+                lines.append("if not _root:")
+                lines.extend(f"    {line}" for line in block)
+        lines.append("if not _root or type(_root) is not dict:")
+        lines.append("    return None")
+        for key in spec.get('require', []):
+            lines.append(f"if {key!r} not in _root:")
+            lines.append("    return None")
+        result = self.struct(lines, _Scope('_root', is_dict=True), {'model': spec.get('model'), 'fields': spec.get('fields', {})})
+
+        source = (
+            "def extract(html):\n"
+            "    _match = _marker.search(html)\n"
+            "    if _match is None:\n"
+            "        return None\n"
+            "    try:\n"
+            "        _data = _decode(_match.group(1))\n"
+            "    except ValueError:\n"
+            "        return None\n"
+            + ''.join(f"    {line}\n" for line in lines)
+            + f"    return {result}\n"
+        )
+        exec(compile(source, f"<spec {self.label}>", 'exec'), self.namespace)
+        extract = self.namespace['extract']
+        extract.source = source
+        return extract
+
+
+def compile_specs(raw: Dict[str, Any]) -> Dict[str, Dict[str, Callable]]:
+    compiled = {}
+    for platform, specs in raw.items():
+        compiled[platform] = {}
+        for spec in specs:
+            name = spec.get('name')
+            if not name:
+                raise SpecError(f"{platform}: 规则缺少 name")
+            compiled[platform][name] = _SpecCompiler(platform, name).compile(spec)
+    return compiled
+
+
+class SpecRegistry:
+    def __init__(self, path: str, reload_interval: float):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.version = 0
+        self._compiled: Dict[str, Dict[str, Callable]] = {}
+        self._mtime: Optional[float] = None
+        self._checked = time.monotonic()
+        self.load()
+
+    def load(self) -> None:
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, encoding='utf-8') as f:
+            raw = json.load(f)
+        self._compiled = compile_specs(raw)
+        self._mtime = mtime
+        self.version += 1
+
+    def maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            self.load()
+            logger.info(f"提取规则已重新加载: {self.path}")
+        except Exception as e:
+            self._mtime = mtime
+            logger.error(f"提取规则重新加载失败，继续使用旧规则: {str(e)}")
+
+    def names(self, platform: str) -> List[str]:
+        return list(self._compiled.get(platform, {}))
+
+    def strategy(self, platform: str, name: str) -> Callable[[str], Optional[models.Struct]]:
+        def run(html: str) -> Optional[models.Struct]:
+            extract = self._compiled.get(platform, {}).get(name)
+            if extract is None:
+                return None
+            return extract(html)
+        return run
+
+
+registry = SpecRegistry(settings.spec_file or DEFAULT_SPEC_FILE, settings.spec_reload_interval)
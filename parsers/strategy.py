@@ -0,0 +1,98 @@
+from typing import Optional, Dict, Any, Callable, List
+import logging
+import time
+
+from .models import Struct
+
+logger = logging.getLogger(__name__)
+
+StrategyFunc = Callable[[str], Optional[Struct]]
+
+
+class Strategy:
+    def __init__(self, name: str, func: StrategyFunc, index: int, alpha: float, fallback: bool = False):
+        self.name = name
+        self.func = func
+        self.index = index
+        self.fallback = fallback
+        self.alpha = alpha
+        self.attempts = 0
+        self.successes = 0
+        self.success_rate = 1.0
+        self.avg_cost = 0.0
+
+    def record(self, success: bool, cost: float) -> None:
+        self.attempts += 1
+        if success:
+            self.successes += 1
+        outcome = 1.0 if success else 0.0
+        if self.attempts == 1:
+            self.avg_cost = cost
+            self.success_rate = outcome
+        else:
+            self.avg_cost += self.alpha * (cost - self.avg_cost)
+            self.success_rate += self.alpha * (outcome - self.success_rate)
+
+    def succeeding(self) -> bool:
+        return self.success_rate >= 0.5
+
+    def expected_cost(self) -> float:
+        # 还没执行过的策略（如热加载新增的提取规则）排在本层最前面，先获得一次尝试
+        if not self.attempts:
+            return 0.0
+        return self.avg_cost / max(self.success_rate, 0.01)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'fallback': self.fallback,
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'success_rate': round(self.success_rate, 4),
+            'avg_cost_ms': round(self.avg_cost * 1000, 3),
+        }
+
+
+class StrategyChain:
+    def __init__(self, alpha: float = 0.3, probe_every: int = 100):
+        self.alpha = alpha
+        self.probe_every = probe_every
+        self.runs = 0
+        self._strategies: List[Strategy] = []
+        self._order: List[Strategy] = []
+
+    def register(self, name: str, func: StrategyFunc, fallback: bool = False) -> None:
+        # 回退策略只能拿到部分字段，与完整提取的结果不等价，始终排在完整提取策略之后
+        strategy = Strategy(name, func, len(self._strategies), self.alpha, fallback)
+        self._strategies.append(strategy)
+        self._strategies.sort(key=lambda s: (s.fallback, s.index))
+        self._order.append(strategy)
+        self._sort()
+
+    def _sort(self) -> None:
+        # 只在同一层内按成功率和耗时重排
+        self._order.sort(key=lambda s: (s.fallback, not s.succeeding(), s.expected_cost(), s.index))
+
+    def order(self) -> List[str]:
+        return [strategy.name for strategy in self._order]
+
+    def run(self, html: str) -> Optional[Struct]:
+        self.runs += 1
+        # 定期按层级和注册顺序执行一次，使排在后面的策略在页面恢复后有机会重新排到前面
+        probing = self.probe_every and self.runs % self.probe_every == 0
+        result = None
+        for strategy in (self._strategies if probing else self._order):
+            start = time.perf_counter()
+            try:
+                result = strategy.func(html)
+            except Exception as e:
+                logger.debug(f"提取策略 {strategy.name} 异常: {str(e)}")
+                result = None
+            strategy.record(result is not None, time.perf_counter() - start)
+            if result is not None:
+                break
+        self._sort()
+        return result
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [strategy.stats() for strategy in self._order]
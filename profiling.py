@@ -0,0 +1,185 @@
+import asyncio
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Iterator
+
+# parse 阶段的耗时减去其中的网络阶段即为提取(extract)耗时
+NETWORK_PHASES = ('redirect', 'fetch', 'api')
+
+_current: ContextVar[Optional["ServerTimings"]] = ContextVar("server_timings", default=None)
+
+PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ServerTimings:
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+        self.descriptions: Dict[str, str] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+    def describe(self, name: str, description: str) -> None:
+        self.descriptions[name] = description
+
+    def phases(self) -> Dict[str, float]:
+        phases = dict(self.durations)
+        parse = phases.pop('parse', None)
+        total = phases.pop('total', None)
+        if parse is not None:
+            network = sum(phases.get(name, 0.0) for name in NETWORK_PHASES)
+            phases['extract'] = max(parse - network, 0.0)
+        if total is not None:
+            phases['total'] = total
+        return phases
+
+    def header(self) -> str:
+        items = []
+        for name, description in self.descriptions.items():
+            if name not in self.durations:
+                items.append(f'{name};desc="{description}"')
+        for name, seconds in self.phases().items():
+            item = f"{name};dur={seconds * 1000:.1f}"
+            if name in self.descriptions:
+                item += f';desc="{self.descriptions[name]}"'
+            items.append(item)
+        return ", ".join(items)
+
+
+@contextmanager
+def collect_timings() -> Iterator[ServerTimings]:
+    timings = ServerTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def describe(name: str, description: str) -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.describe(name, description)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def profiling_authorized(token: Optional[str], expected: str) -> bool:
+    if not token or not expected:
+        return False
+    return hmac.compare_digest(token.encode(), expected.encode())
+
+
+class SamplingProfiler:
+    # 事件循环线程上同时运行着其他请求，只保留调用栈中包含本请求处理协程帧的采样，
+    # 调用栈从该帧开始截取；本请求挂起等待（网络 IO 或其他请求占用循环）的采样计入 "(await)"
+    def __init__(self, interval: float = 0.001, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.waiting = 0
+        self._target_thread: Optional[int] = None
+        self._anchor = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, frame=None) -> None:
+        self._target_thread = threading.get_ident()
+        self._anchor = frame if frame is not None else sys._getframe(1)
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.collapsed()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and frame is not self._anchor:
+                stack.append(frame)
+                frame = frame.f_back
+            if frame is None:
+                self.waiting += 1
+                continue
+            stack.append(frame)
+            stack = stack[-self.max_depth:]
+            self.samples[";".join(self._label(f) for f in reversed(stack))] += 1
+
+    @staticmethod
+    def _label(frame) -> str:
+        code = frame.f_code
+        return f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}"
+
+    def collapsed(self) -> str:
+        lines = [f"{stack} {count}" for stack, count in self.samples.most_common()]
+        if self.waiting and self._anchor is not None:
+            code = self._anchor.f_code
+            lines.append(f"{os.path.basename(code.co_filename)}:{code.co_name};(await) {self.waiting}")
+        return "\n".join(lines)
+
+
+class ProfileStore:
+    def __init__(self, directory: str, max_profiles: int = 100):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    async def save(self, profile: str) -> str:
+        profile_id = uuid.uuid4().hex
+        await asyncio.to_thread(self._write, profile_id, profile)
+        return profile_id
+
+    def _write(self, profile_id: str, profile: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path(profile_id), 'w', encoding='utf-8') as f:
+            f.write(profile)
+        # 只保留最近的 max_profiles 份，旧的按修改时间删除
+        profiles = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.folded'):
+                try:
+                    profiles.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+                except OSError:
+                    pass
+        profiles.sort()
+        for _, name in profiles[:max(len(profiles) - self.max_profiles, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def load(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.folded")
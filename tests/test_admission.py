@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, Saturated, INTERACTIVE, BULK
+
+
+def test_interactive_scheduled_before_bulk_with_platform_fairness():
+    async def run():
+        admission = AdmissionController(max_concurrency=1, max_queue=10, queue_timeout=5)
+        order = []
+
+        async def request(priority, platform, name):
+            async with admission.slot(priority, platform):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        await admission.acquire(INTERACTIVE, "douyin")
+        tasks = [
+            asyncio.create_task(request(BULK, "douyin", "bulk-douyin")),
+            asyncio.create_task(request(INTERACTIVE, "douyin", "douyin-1")),
+            asyncio.create_task(request(INTERACTIVE, "douyin", "douyin-2")),
+            asyncio.create_task(request(INTERACTIVE, "bilibili", "bilibili-1")),
+        ]
+        await asyncio.sleep(0)
+        admission.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["douyin-1", "bilibili-1", "douyin-2", "bulk-douyin"]
+        assert admission.active == 0
+
+    asyncio.run(run())
+
+
+def test_rejects_when_queue_full():
+    async def run():
+        admission = AdmissionController(max_concurrency=1, max_queue=2, queue_timeout=5)
+        await admission.acquire(INTERACTIVE, "douyin")
+        waiter = asyncio.create_task(admission.acquire(BULK, "douyin"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(Saturated):
+            await admission.acquire(BULK, "kuaishou")
+
+        interactive = asyncio.create_task(admission.acquire(INTERACTIVE, "kuaishou"))
+        await asyncio.sleep(0)
+        with pytest.raises(Saturated) as excinfo:
+            await admission.acquire(INTERACTIVE, "kuaishou")
+        assert excinfo.value.retry_after >= 1
+
+        admission.release()
+        await interactive
+        admission.release()
+        await waiter
+        admission.release()
+        assert admission.active == 0
+
+    asyncio.run(run())
+
+
+def test_queue_timeout_frees_queue_position():
+    async def run():
+        admission = AdmissionController(max_concurrency=1, max_queue=4, queue_timeout=0.01)
+        await admission.acquire(INTERACTIVE, "douyin")
+        with pytest.raises(Saturated):
+            await admission.acquire(INTERACTIVE, "douyin")
+        assert admission.queued == 0
+        admission.release()
+        assert admission.active == 0
+
+    asyncio.run(run())
@@ -2,23 +2,26 @@ import pytest
 from fastapi.testclient import TestClient
 from main import app
 
-client = TestClient(app)
 
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
 
-def test_root():
+
+def test_root(client):
     response = client.get("/")
     assert response.status_code == 200
     assert "message" in response.json()
     assert "supported_platforms" in response.json()
 
 
-def test_health():
+def test_health(client):
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
 
-def test_get_platforms():
+def test_get_platforms(client):
     response = client.get("/platforms")
     assert response.status_code == 200
     data = response.json()
@@ -32,12 +35,36 @@ def test_get_platforms():
     assert "kuaishou" in platform_keys
 
 
-def test_parse_invalid_url():
+def test_parse_invalid_url(client):
     response = client.post("/parse", json={"url": "https://example.com/video"})
     assert response.status_code == 400
 
 
-def test_parse_xiaohongshu_url_structure():
+def test_parse_invalid_url_cached(client):
+    url = "https://example.com/unsupported-video"
+    assert client.post("/parse", json={"url": url}).status_code == 400
+    response = client.post("/parse", json={"url": url})
+    assert response.status_code == 400
+    assert client.get("/stats").json()["unsupported_cache"]["permanent_hits"] >= 1
+
+
+def test_unsupported_urls_do_not_evict_platform_failures(client, monkeypatch):
+    import main
+    from cache import NegativeCache, PERMANENT
+
+    negative_cache = NegativeCache(transient_ttl=10, permanent_ttl=300, max_entries=2)
+    unsupported_cache = NegativeCache(transient_ttl=0, permanent_ttl=300, max_entries=2)
+    monkeypatch.setattr(main, "negative_cache", negative_cache)
+    monkeypatch.setattr(main, "unsupported_cache", unsupported_cache)
+    negative_cache.set("douyin:7001", PERMANENT, "无法提取视频信息")
+
+    for index in range(5):
+        assert client.post("/parse", json={"url": f"https://example.com/{index}"}).status_code == 400
+    assert len(unsupported_cache) == 2
+    assert negative_cache.get("douyin:7001") is not None
+
+
+def test_parse_xiaohongshu_url_structure(client):
     response = client.post("/parse", json={
         "url": "https://www.xiaohongshu.com/explore/xxxxx"
     })
@@ -48,7 +75,7 @@ def test_parse_xiaohongshu_url_structure():
     assert "success" in data
 
 
-def test_parse_douyin_url_structure():
+def test_parse_douyin_url_structure(client):
     response = client.post("/parse", json={
         "url": "https://www.douyin.com/video/7xxxxx"
     })
@@ -59,7 +86,7 @@ def test_parse_douyin_url_structure():
     assert "success" in data
 
 
-def test_parse_bilibili_url_structure():
+def test_parse_bilibili_url_structure(client):
     response = client.post("/parse", json={
         "url": "https://www.bilibili.com/video/BVxxxxxxx"
     })
@@ -70,7 +97,7 @@ def test_parse_bilibili_url_structure():
     assert "success" in data
 
 
-def test_parse_kuaishou_url_structure():
+def test_parse_kuaishou_url_structure(client):
     response = client.post("/parse", json={
         "url": "https://www.kuaishou.com/short-video/xxxxx"
     })
@@ -79,3 +106,75 @@ def test_parse_kuaishou_url_structure():
     assert "platform" in data
     assert data["platform"] == "kuaishou"
     assert "success" in data
+
+
+def test_parse_returns_server_timing(client):
+    response = client.post("/parse", json={
+        "url": "https://www.kuaishou.com/short-video/xxxxx"
+    })
+    assert response.status_code == 200
+    assert "total;dur=" in response.headers["server-timing"]
+
+
+def test_parse_profiling_requires_token(client):
+    response = client.post(
+        "/parse",
+        json={"url": "https://www.kuaishou.com/short-video/xxxxx"},
+        headers={"X-Profile-Token": "wrong"},
+    )
+    assert response.status_code == 403
+
+
+def test_export_xiaohongshu_streams_zip(client, monkeypatch):
+    import io
+    import zipfile
+    from main import cache_key, get_parser, result_cache
+    from parsers.models import Image, XiaohongshuResult
+
+    url = "https://www.xiaohongshu.com/explore/exportnote"
+    result_cache.set(cache_key("xiaohongshu", url), "xiaohongshu", url, XiaohongshuResult(
+        note_id="exportnote",
+        images=[
+            Image(url="http://sns-webpic-qc.xhscdn.com/a!nd_dft_wlteh_webp_3"),
+            Image(url="http://sns-webpic-qc.xhscdn.com/b!nd_dft_wlteh_jpg_3"),
+        ],
+    ))
+
+    async def fake_iter_image(image_url):
+        yield image_url.encode()
+
+    monkeypatch.setattr(get_parser("xiaohongshu"), "iter_image", fake_iter_image)
+    response = client.get("/export/xiaohongshu", params={"url": url})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.namelist() == ["01.webp", "02.jpg"]
+
+
+def test_export_rejects_other_platforms(client):
+    response = client.get("/export/xiaohongshu", params={"url": "https://www.douyin.com/video/7xxxxx"})
+    assert response.status_code == 400
+
+
+def test_refresh_parses_go_through_bulk_admission(monkeypatch):
+    import asyncio
+    import main
+    from admission import AdmissionController, BULK, INTERACTIVE, Saturated
+    from parsers.models import KuaishouFallback
+
+    async def fake_parse(url):
+        return KuaishouFallback(video_url=url)
+
+    monkeypatch.setattr(main.get_parser("kuaishou"), "parse", fake_parse)
+    admission = AdmissionController(max_concurrency=1, max_queue=2, queue_timeout=5, bulk_queue_ratio=0)
+    monkeypatch.setattr(main, "admission", admission)
+
+    async def run():
+        assert await main.parse_upstream("kuaishou", "u") == KuaishouFallback(video_url="u")
+        assert admission.admitted[BULK] == 1
+        await admission.acquire(INTERACTIVE, "douyin")
+        with pytest.raises(Saturated):
+            await main.parse_upstream("kuaishou", "u")
+        admission.release()
+
+    asyncio.run(run())
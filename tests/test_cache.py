@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import httpx
+
+from admission import Saturated
+from cache import (
+    PERMANENT,
+    TRANSIENT,
+    BackgroundRefresher,
+    NegativeCache,
+    ResultCache,
+    cache_key,
+    failure_kind,
+    url_expires_at,
+)
+from parsers.douyin_session import ChallengePage
+from parsers.models import BilibiliResult, DouyinFallback
+
+
+def test_cache_key_uses_video_id():
+    assert cache_key("bilibili", "https://www.bilibili.com/video/BV1xx411c7mD?p=1") == "bilibili:BV1xx411c7mD"
+    assert cache_key("douyin", "https://www.douyin.com/jingxuan?modal_id=7123") == "douyin:7123"
+
+
+def test_url_expires_at():
+    assert url_expires_at("https://upos-sz.bilivideo.com/a.mp4?deadline=1900000000&gen=playurl") == 1900000000
+    assert url_expires_at("https://sns-video-bd.xhscdn.com/stream/abc") is None
+    assert url_expires_at(None) is None
+
+
+def test_entry_expires_with_signed_url():
+    cache = ResultCache(ttl=600, max_entries=10)
+    now = time.time()
+    cache.set("k", "bilibili", "u", BilibiliResult(video_url=f"https://x/a.mp4?deadline={int(now) + 30}"), now=now)
+    assert cache.get("k", now=now + 10) is not None
+    assert cache.get("k", now=now + 31) is None
+
+
+def test_cache_evicts_oldest():
+    cache = ResultCache(ttl=600, max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, "douyin", key, DouyinFallback())
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_refresher_refreshes_hot_entries_within_budget():
+    async def run():
+        calls = []
+
+        async def parse(platform, url):
+            calls.append(url)
+            await asyncio.sleep(0)
+            return DouyinFallback(video_url=f"{url}-new")
+
+        cache = ResultCache(ttl=30, max_entries=10)
+        for key in ("hot1", "hot2", "cold"):
+            cache.set(key, "douyin", key, DouyinFallback(video_url=key))
+        for _ in range(3):
+            cache.get("hot1")
+            cache.get("hot2")
+
+        refresher = BackgroundRefresher(
+            cache, parse, interval=1, refresh_ahead=60,
+            hot_threshold=3, budget_per_minute=1, concurrency=2,
+        )
+        tasks = refresher.refresh_due()
+        await asyncio.gather(*tasks)
+
+        assert len(calls) == 1
+        assert refresher.skipped_budget == 1
+        refreshed = cache.get(calls[0])
+        assert refreshed.value.video_url == f"{calls[0]}-new"
+
+    asyncio.run(run())
+
+
+def test_failure_kind():
+    request = httpx.Request("GET", "https://www.xiaohongshu.com/explore/abc")
+    not_found = httpx.HTTPStatusError("", request=request, response=httpx.Response(404, request=request))
+    bad_gateway = httpx.HTTPStatusError("", request=request, response=httpx.Response(502, request=request))
+    assert failure_kind(not_found) == PERMANENT
+    assert failure_kind(bad_gateway) == TRANSIENT
+    assert failure_kind(httpx.ConnectTimeout("timeout")) == TRANSIENT
+    assert failure_kind(ValueError("bad json")) == PERMANENT
+    assert failure_kind(ChallengePage("https://www.douyin.com/video/1")) == TRANSIENT
+
+
+def test_negative_cache_ttl_per_kind():
+    cache = NegativeCache(transient_ttl=10, permanent_ttl=300, max_entries=10)
+    now = time.time()
+    cache.set("a", TRANSIENT, "timeout", now=now)
+    cache.set("b", PERMANENT, "无法提取视频信息", now=now)
+    assert cache.get("a", now=now + 5).error == "timeout"
+    assert cache.get("a", now=now + 11) is None
+    assert cache.get("b", now=now + 11).kind == PERMANENT
+    assert cache.stats()["permanent_hits"] == 1
+
+
+def test_refresher_skips_when_admission_saturated():
+    async def run():
+        async def parse(platform, url):
+            raise Saturated(1)
+
+        cache = ResultCache(ttl=30, max_entries=10)
+        cache.set("hot", "douyin", "hot", DouyinFallback(video_url="hot"))
+        for _ in range(3):
+            cache.get("hot")
+        refresher = BackgroundRefresher(
+            cache, parse, interval=1, refresh_ahead=60,
+            hot_threshold=3, budget_per_minute=10, concurrency=1,
+        )
+        await asyncio.gather(*refresher.refresh_due())
+        assert refresher.skipped_saturated == 1
+        assert refresher.failed == 0
+        assert cache.get("hot").value.video_url == "hot"
+
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+import asyncio
+
+import httpx
+import pytest
+
+from parsers.douyin import DouyinParser
+from parsers.douyin_session import ChallengePage, DouyinSessionPool, is_challenge_page
+
+
+def test_is_challenge_page():
+    assert is_challenge_page('<script>window.byted_acrawler.init()</script>')
+    assert not is_challenge_page('<script id="RENDER_DATA" type="application/json">%7B%7D</script>')
+    assert not is_challenge_page('<html><title>抖音</title></html>')
+
+
+def test_pool_rotates_and_retires_challenged_sessions():
+    async def run():
+        pool = DouyinSessionPool(headers={}, size=2, max_challenges=2, max_requests=100)
+        first = pool.acquire()
+        second = pool.acquire()
+        assert first is not second
+        await pool.release(first, challenged=True)
+        await pool.release(second, challenged=False)
+
+        assert pool.acquire() is first
+        await pool.release(first, challenged=True)
+        assert first.retired
+        assert first.client.is_closed
+        assert pool.retired == 1
+
+        replacement = pool.acquire()
+        assert replacement is not first
+        await pool.release(replacement, challenged=False)
+        await pool.close()
+        assert second.client.is_closed
+
+    asyncio.run(run())
+
+
+def test_retired_session_closed_after_last_inflight_request():
+    async def run():
+        pool = DouyinSessionPool(headers={}, size=1, max_challenges=1, max_requests=100)
+        session = pool.acquire()
+        assert pool.acquire() is session
+        await pool.release(session, challenged=True)
+        assert session.retired
+        assert not session.client.is_closed
+        await pool.release(session, challenged=False)
+        assert session.client.is_closed
+
+    asyncio.run(run())
+
+
+class FakeClient:
+    def __init__(self, status=200, text='<script>window.byted_acrawler.init()</script>'):
+        self.status = status
+        self.text = text
+        self.requests = 0
+
+    def stream(self, method, url):
+        self.requests += 1
+        self.url = url
+        return self
+
+    async def __aenter__(self):
+        return httpx.Response(self.status, text=self.text, request=httpx.Request("GET", self.url))
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def aclose(self):
+        pass
+
+
+def use_client(monkeypatch, parser, client):
+    acquire = parser.sessions.acquire
+
+    def acquire_with_client():
+        session = acquire()
+        session.client = client
+        return session
+
+    monkeypatch.setattr(parser.sessions, "acquire", acquire_with_client)
+
+
+def test_parser_raises_when_every_attempt_is_challenged(monkeypatch):
+    parser = DouyinParser()
+    client = FakeClient()
+    use_client(monkeypatch, parser, client)
+
+    async def run():
+        with pytest.raises(ChallengePage):
+            await parser.parse("https://www.douyin.com/video/7123")
+        await parser.close()
+
+    asyncio.run(run())
+    assert client.requests == 2
+
+
+def test_upstream_error_status_cached_as_transient(monkeypatch):
+    import main
+    from cache import TRANSIENT
+
+    parser = DouyinParser()
+    use_client(monkeypatch, parser, FakeClient(status=503, text="<html>busy</html>"))
+    url = "https://www.douyin.com/video/7503"
+    key = main.cache_key("douyin", url)
+
+    async def run():
+        result = await main.parse_and_cache("douyin", parser, url, key)
+        await parser.close()
+        return result
+
+    assert not asyncio.run(run()).success
+    assert main.negative_cache.get(key).kind == TRANSIENT
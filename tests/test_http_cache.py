@@ -0,0 +1,176 @@
+import asyncio
+import os
+
+import httpx
+
+import parsers.base
+from parsers.http_cache import HttpCache, UpstreamResponse, _digest, freshness_lifetime
+from parsers.kuaishou import KuaishouParser
+
+URL = "https://www.kuaishou.com/short-video/abc"
+
+
+class Upstream:
+    def __init__(self, headers, body=b"<html>page</html>"):
+        self.headers = headers
+        self.body = body
+        self.requests = []
+
+    async def __call__(self, url, headers):
+        self.requests.append(headers)
+        etag = self.headers.get("ETag")
+        if etag and headers.get("If-None-Match") == etag:
+            return UpstreamResponse(304, httpx.Headers(self.headers), b"")
+        return UpstreamResponse(200, httpx.Headers(self.headers), self.body, "utf-8")
+
+
+def fetch_twice(cache, upstream):
+    async def run():
+        first = await cache.fetch(URL, {"User-Agent": "test"}, upstream)
+        second = await cache.fetch(URL, {"User-Agent": "test"}, upstream)
+        return first, second
+
+    return asyncio.run(run())
+
+
+def test_fresh_response_served_from_disk(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    upstream = Upstream({"Cache-Control": "max-age=60"})
+    first, second = fetch_twice(cache, upstream)
+    assert first.body == second.body == upstream.body
+    assert second.encoding == "utf-8"
+    assert len(upstream.requests) == 1
+
+    stats = cache.stats()["hosts"]["www.kuaishou.com"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes_saved"] == len(upstream.body)
+    assert stats["hit_ratio"] == 0.5
+
+    restarted = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    response = asyncio.run(restarted.fetch(URL, {}, upstream))
+    assert response.body == upstream.body
+    assert len(upstream.requests) == 1
+
+
+def test_stale_response_revalidated_with_etag(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    upstream = Upstream({"Cache-Control": "no-cache", "ETag": '"v1"'})
+    first, second = fetch_twice(cache, upstream)
+    assert second.body == first.body
+    assert upstream.requests[1]["If-None-Match"] == '"v1"'
+    assert upstream.requests[1]["User-Agent"] == "test"
+
+    stats = cache.stats()["hosts"]["www.kuaishou.com"]
+    assert stats["revalidated"] == 1
+    assert stats["bytes_saved"] == len(upstream.body)
+
+
+def test_uncacheable_responses_not_stored(tmp_path):
+    for headers in ({"Cache-Control": "no-store", "ETag": '"v1"'}, {}):
+        cache = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+        upstream = Upstream(headers)
+        fetch_twice(cache, upstream)
+        assert len(upstream.requests) == 2
+        assert "If-None-Match" not in upstream.requests[1]
+        assert cache.stats()["entries"] == 0
+
+
+def test_evicts_least_recently_used_over_budget(tmp_path):
+    cache = HttpCache(str(tmp_path), max_bytes=1500, compress_level=0)
+    upstream = Upstream({"Cache-Control": "max-age=60"}, body=b"x" * 1000)
+
+    async def run():
+        await cache.fetch(URL + "1", {}, upstream)
+        await cache.fetch(URL + "2", {}, upstream)
+        await cache.fetch(URL + "2", {}, upstream)
+        await cache.fetch(URL + "1", {}, upstream)
+
+    asyncio.run(run())
+    assert len(upstream.requests) == 3
+    assert cache.stats()["entries"] == 1
+    assert cache.stored_bytes <= 1500
+    assert len(list(tmp_path.glob("*.z"))) == 1
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({"Cache-Control": "public, max-age=120", "Age": "20"}, 0) == 100
+    assert freshness_lifetime({"Cache-Control": "private, no-store"}, 0) is None
+    assert freshness_lifetime({
+        "Expires": "Thu, 01 Jan 2026 00:10:00 GMT",
+        "Date": "Thu, 01 Jan 2026 00:00:00 GMT",
+    }, 0) == 600
+    assert freshness_lifetime({"Expires": "0"}, 0) == 0
+
+
+def test_fetch_page_goes_through_cache(tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    monkeypatch.setattr(parsers.base, "upstream_cache", cache)
+    parser = KuaishouParser()
+    upstream = Upstream({"Cache-Control": "max-age=60"}, body="快手".encode("utf-8"))
+    monkeypatch.setattr(parser, "send", upstream)
+
+    async def run():
+        return [await parser.fetch_page(URL) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["快手"] * 3
+    assert len(upstream.requests) == 1
+
+
+def test_restarts_stay_within_budget(tmp_path):
+    upstream = Upstream({"Cache-Control": "max-age=60"}, body=b"x" * 1000)
+    for index in range(5):
+        cache = HttpCache(str(tmp_path), max_bytes=1500, compress_level=0)
+        asyncio.run(cache.fetch(f"{URL}{index}", {}, upstream))
+        assert cache.stored_bytes <= 1500
+        assert sum(path.stat().st_size for path in tmp_path.glob("*.z")) <= 1500
+    assert cache.stats()["entries"] == 1
+
+    orphan = tmp_path / "orphan.z"
+    orphan.write_bytes(b"x" * 100)
+    os.utime(orphan, (0, 0))
+    restarted = HttpCache(str(tmp_path), max_bytes=1500, compress_level=0)
+    response = asyncio.run(restarted.fetch(f"{URL}4", {}, upstream))
+    assert response.body == upstream.body
+    assert len(upstream.requests) == 5
+    assert not orphan.exists()
+    assert restarted.stored_bytes == sum(path.stat().st_size for path in tmp_path.glob("*.z"))
+
+
+def test_concurrent_writers_never_share_temp_files(tmp_path):
+    import threading
+
+    caches = [HttpCache(str(tmp_path), max_bytes=1024 * 1024) for _ in range(2)]
+    errors = []
+
+    def write(cache, body):
+        try:
+            for _ in range(200):
+                cache._write_body("same", body)
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(cache, bytes([i]) * 50000)) for i, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert caches[0]._load_body("same", _digest((tmp_path / "same.z").read_bytes())) in (b"\0" * 50000, b"\1" * 50000)
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_body_from_another_writer_is_not_served(tmp_path):
+    ours = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    theirs = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    upstream = Upstream({"Cache-Control": "max-age=60"}, body=b"theirs")
+    asyncio.run(theirs.fetch(URL, {}, upstream))
+
+    key = next(tmp_path.glob("*.json")).stem
+    entry = theirs._read_meta(key)
+    entry.digest = ours._write_body(key + "x", b"ours")[1]
+    ours._write_meta(key, entry)
+
+    restarted = HttpCache(str(tmp_path), max_bytes=1024 * 1024)
+    assert asyncio.run(restarted.fetch(URL, {}, upstream)).body == b"theirs"
+    assert len(upstream.requests) == 2
@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+import pytest
+
+from memory import MemoryTracker
+from parsers.base import ResponseTooLarge
+from parsers.kuaishou import KuaishouParser
+
+
+def test_tracker_records_peak_per_platform():
+    tracker = MemoryTracker(sample_rate=1.0)
+    with tracker.track("douyin"):
+        buffer = bytearray(2 * 1024 * 1024)
+        del buffer
+    stats = tracker.stats()["douyin"]
+    assert stats["samples"] == 1
+    assert stats["max_peak_bytes"] >= 2 * 1024 * 1024
+
+
+def test_tracker_disabled_records_nothing():
+    tracker = MemoryTracker(sample_rate=0)
+    with tracker.track("douyin"):
+        pass
+    assert tracker.stats() == {}
+
+
+def test_read_limited_rejects_oversized_body():
+    def handler(request):
+        return httpx.Response(200, content=b"x" * 2048)
+
+    async def fetch(limit):
+        parser = KuaishouParser()
+        parser.max_response_bytes = limit
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            async with client.stream("GET", "https://www.kuaishou.com/") as response:
+                return await parser.read_text(response)
+
+    assert len(asyncio.run(fetch(4096))) == 2048
+    with pytest.raises(ResponseTooLarge):
+        asyncio.run(fetch(1024))
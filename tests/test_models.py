@@ -0,0 +1,64 @@
+import json
+
+from parsers.models import DouyinBitrate, DouyinResult, DouyinVideo, encode_json, to_builtins
+from parsers.xiaohongshu import XiaohongshuParser
+
+
+def test_encode_json_matches_dict_shape():
+    result = DouyinResult(aweme_id="7", video=DouyinVideo(duration=1000))
+    data = json.loads(encode_json(result))
+    assert list(data) == ["aweme_id", "title", "author", "statistics", "video", "video_url", "music"]
+    assert "bitrate_urls" not in data["video"]
+    assert data == to_builtins(result)
+
+    result.video.bitrate_urls = [DouyinBitrate(bit_rate=1, gear_name="720p", url="u")]
+    data = json.loads(encode_json(result))
+    assert data["video"]["bitrate_urls"] == [{"bit_rate": 1, "gear_name": "720p", "url": "u"}]
+
+
+def test_xiaohongshu_image_note_result():
+    state = {
+        "note": {"noteDetailMap": {"abc": {"note": {
+            "noteId": "abc",
+            "title": "标题",
+            "type": "normal",
+            "user": {"nickname": "作者", "userId": "u1"},
+            "imageList": [{"urlDefault": "http://img/1", "width": 1080, "height": 1440}],
+        }}}}
+    }
+    html = f"<script>window.__INITIAL_STATE__={json.dumps(state, ensure_ascii=False)}</script>"
+    result = XiaohongshuParser().strategies.run(html)
+    assert to_builtins(result) == {
+        "note_id": "abc",
+        "title": "标题",
+        "desc": "",
+        "type": "normal",
+        "user": {"nickname": "作者", "user_id": "u1"},
+        "video": {"duration": None, "width": None, "height": None},
+        "images": [{"url": "http://img/1", "width": 1080, "height": 1440}],
+        "video_url": None,
+    }
+
+
+def test_xiaohongshu_video_key_omitted_for_full_urls():
+    parser = XiaohongshuParser()
+
+    def extract(key):
+        state = {"note": {"noteDetailMap": {"abc": {"note": {
+            "noteId": "abc",
+            "type": "video",
+            "video": {"consumer": {"originVideoKey": key}},
+        }}}}}
+        return to_builtins(parser.strategies.run(f"<script>window.__INITIAL_STATE__={json.dumps(state)}</script>"))
+
+    data = extract("pre/abc.mp4")
+    assert data["video_key"] == "pre/abc.mp4"
+    assert data["video_url"] == "http://sns-video-bd.xhscdn.com/stream/pre/abc.mp4"
+
+    result = parser.strategies.run(
+        '<script>window.__INITIAL_STATE__={"note":{"noteDetailMap":{"abc":{"note":'
+        '{"noteId":"abc","video":{"consumer":{"originVideoKey":"https://cdn/abc.mp4"}}}}}}}</script>'
+    )
+    assert "video_key" not in json.loads(encode_json(result))
+    data = to_builtins(result)
+    assert data["video_url"] == "https://cdn/abc.mp4"
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+
+from profiling import SamplingProfiler, ProfileStore, collect_timings, timed, profiling_authorized
+
+
+def test_extract_is_parse_minus_network_phases():
+    with collect_timings() as timings:
+        timings.add("redirect", 0.010)
+        timings.add("fetch", 0.050)
+        timings.add("parse", 0.070)
+        timings.add("total", 0.075)
+    phases = timings.phases()
+    assert "parse" not in phases
+    assert abs(phases["extract"] - 0.010) < 1e-9
+    assert list(phases)[-1] == "total"
+    assert timings.header().startswith("redirect;dur=10.0, fetch;dur=50.0")
+
+
+def test_timed_is_noop_without_collector():
+    with timed("fetch"):
+        pass
+    with collect_timings() as timings:
+        with timed("fetch"):
+            pass
+    assert "fetch" in timings.durations
+
+
+def test_profiling_authorized():
+    assert not profiling_authorized("secret", "")
+    assert not profiling_authorized(None, "secret")
+    assert not profiling_authorized("guess", "secret")
+    assert profiling_authorized("secret", "secret")
+
+
+def test_sampling_profiler_roundtrip(tmp_path):
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    profile = profiler.stop()
+    assert "test_sampling_profiler_roundtrip" in profile
+
+    store = ProfileStore(str(tmp_path))
+    profile_id = asyncio.run(store.save(profile))
+    assert store.load(profile_id) == profile
+    assert store.load("../etc/passwd") is None
+
+
+def test_profiler_keeps_only_request_frames():
+    def busy(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    async def other_request():
+        await asyncio.sleep(0.005)
+        busy(0.03)
+
+    async def profiled_request(profiler):
+        profiler.start()
+        busy(0.03)
+        await asyncio.sleep(0.05)
+        return profiler.stop()
+
+    async def run():
+        profiler = SamplingProfiler(interval=0.001)
+        other = asyncio.create_task(other_request())
+        profile = await profiled_request(profiler)
+        await other
+        return profiler, profile
+
+    profiler, profile = asyncio.run(run())
+    stacks = [line.rsplit(" ", 1)[0] for line in profile.splitlines()]
+    assert all(stack.startswith("test_profiling.py:profiled_request") for stack in stacks)
+    assert not any("other_request" in stack or "select" in stack for stack in stacks)
+    assert any("busy" in stack for stack in stacks)
+    assert profiler.waiting > 0
+    assert profile.endswith(f"(await) {profiler.waiting}")
+
+
+def test_profile_store_keeps_most_recent(tmp_path):
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+
+    async def run():
+        ids = []
+        for index in range(4):
+            ids.append(await store.save(str(index)))
+            os.utime(tmp_path / f"{ids[-1]}.folded", (index, index))
+        return ids
+
+    ids = asyncio.run(run())
+    assert sorted(path.stem for path in tmp_path.glob("*.folded")) == sorted(ids[2:])
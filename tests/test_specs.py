@@ -0,0 +1,141 @@
+import json
+import os
+import urllib.parse
+
+import pytest
+
+from parsers.douyin import DouyinParser
+from parsers.kuaishou import KuaishouParser
+from parsers.models import KuaishouSsrResult, to_builtins
+from parsers.specs import SpecError, SpecRegistry, compile_specs, registry
+
+
+def render_data(data):
+    encoded = urllib.parse.quote(json.dumps(data))
+    return f'<script id="RENDER_DATA" type="application/json">{encoded}</script>'
+
+
+def test_douyin_spec_walks_nested_layout():
+    html = render_data({"0": {"aweme": {"detail": {
+        "awemeId": "7",
+        "desc": "标题",
+        "stats": {"diggCount": 5},
+        "video": {
+            "duration": 1000,
+            "playAddr": {"urlList": ["http://v/1"]},
+            "bitRateList": [
+                {"bitRate": 1, "gearName": "720p", "playAddr": [{"src": "http://b/1"}]},
+                {"bitRate": 2, "gearName": "1080p", "playAddr": ["http://b/2"]},
+                "bad",
+            ],
+        },
+    }}}})
+    result = registry.strategy("douyin", "render_data")(html)
+    data = to_builtins(result)
+    assert data["aweme_id"] == "7"
+    assert data["title"] == "标题"
+    assert data["statistics"] == {"digg_count": 5, "comment_count": 0, "share_count": 0}
+    assert data["video_url"] == "http://v/1"
+    assert data["video"]["bitrate_urls"] == [
+        {"bit_rate": 1, "gear_name": "720p", "url": "http://b/1"},
+        {"bit_rate": 2, "gear_name": "1080p", "url": "http://b/2"},
+    ]
+    assert data["music"] == {"title": "", "author": "", "url": ""}
+
+
+def test_douyin_spec_omits_empty_bitrates_and_rejects_missing_detail():
+    extract = registry.strategy("douyin", "render_data")
+    result = extract(render_data({"app": {"videoDetail": {"awemeId": "1", "video": {"bitRateList": []}}}}))
+    assert "bitrate_urls" not in to_builtins(result)["video"]
+    assert extract(render_data({"app": {}})) is None
+    assert extract('<script id="RENDER_DATA" type="application/json">%7Bbroken</script>') is None
+
+
+def test_kuaishou_specs_registered_before_fallback():
+    parser = KuaishouParser()
+    assert parser.strategies.order() == ["page_data", "ssr_data", "src_no_mark"]
+
+    html = "<script>window.pageData=" + json.dumps({"video": {
+        "photoId": "p1",
+        "userName": "作者",
+        "mainMvUrls": [],
+        "photoUrl": "http://photo",
+    }}) + ";</script>"
+    data = to_builtins(parser.extract(html))
+    assert data["photo_id"] == "p1"
+    assert data["author"] == {"user_id": None, "user_name": "作者", "user_sex": ""}
+    assert data["video_url"] == "http://photo"
+
+    html = "<script>window.SSR_DATA=" + json.dumps({"videoResource": {"url": "http://ssr"}}) + ";</script>"
+    assert to_builtins(parser.extract(html)) == {"video_url": "http://ssr", "caption": "", "cover": ""}
+
+
+def test_compile_rejects_unknown_fields():
+    with pytest.raises(SpecError):
+        compile_specs({"douyin": [{
+            "name": "bad",
+            "marker": "(x)",
+            "model": "DouyinResult",
+            "fields": {"nope": "a"},
+        }]})
+
+
+def write_specs(path, field, mtime):
+    path.write_text(json.dumps({"kuaishou": [{
+        "name": "ssr_data",
+        "marker": r"window\.SSR_DATA\s*=\s*({.*?});",
+        "require": ["videoResource"],
+        "model": "KuaishouSsrResult",
+        "fields": {"video_url": field},
+    }]}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_registry_hot_reloads_and_keeps_last_good_specs(tmp_path):
+    path = tmp_path / "specs.json"
+    write_specs(path, "videoResource.url", 1000)
+    specs = SpecRegistry(str(path), reload_interval=0)
+    extract = specs.strategy("kuaishou", "ssr_data")
+    html = "window.SSR_DATA=" + json.dumps({"videoResource": {"url": "a", "backupUrl": "b"}}) + ";"
+    assert extract(html).video_url == "a"
+
+    write_specs(path, "videoResource.backupUrl", 2000)
+    specs.maybe_reload()
+    assert specs.version == 2
+    assert extract(html).video_url == "b"
+
+    path.write_text("{broken", encoding="utf-8")
+    os.utime(path, (3000, 3000))
+    specs.maybe_reload()
+    assert specs.version == 2
+    assert extract(html).video_url == "b"
+
+
+def test_parser_registers_specs_added_by_reload(monkeypatch):
+    parser = DouyinParser()
+    monkeypatch.setattr(registry, "version", registry.version + 1)
+    monkeypatch.setattr(registry, "names", lambda platform: ["render_data", "render_data_v2"])
+    parser.extract("<html></html>")
+    assert set(parser.strategies.order()) == {"render_data", "play_addr", "render_data_v2"}
+
+
+def test_spec_added_by_reload_runs_while_fallback_succeeds(monkeypatch):
+    parser = KuaishouParser()
+    page = '<script>{"srcNoMark":"https://v.kwaicdn.com/a.mp4"}</script>'
+    for _ in range(50):
+        assert parser.extract(page).video_url == "https://v.kwaicdn.com/a.mp4"
+
+    calls = []
+
+    def page_data_v2(html):
+        calls.append(html)
+        return KuaishouSsrResult(video_url="https://v.kwaicdn.com/full.mp4")
+
+    monkeypatch.setattr(registry, "version", registry.version + 1)
+    monkeypatch.setattr(registry, "names", lambda platform: ["page_data", "ssr_data", "page_data_v2"])
+    monkeypatch.setattr(registry, "strategy", lambda platform, name: page_data_v2)
+    result = parser.extract(page)
+    assert calls == [page]
+    assert result == KuaishouSsrResult(video_url="https://v.kwaicdn.com/full.mp4")
+    assert parser.strategies.order()[0] == "page_data_v2"
+    assert parser.strategies.order()[-1] == "src_no_mark"
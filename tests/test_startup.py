@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 在框架已导入的前提下测量导入 main 的耗时，只反映本项目代码，不受 FastAPI 本身导入速度波动影响
+MEASURE = """
+import json, sys, time
+import fastapi, fastapi.responses, fastapi.middleware.cors, pydantic, pydantic_settings
+start = time.perf_counter()
+import main
+elapsed = (time.perf_counter() - start) * 1000
+deferred = ['bs4', 'httpx', 'parsers.base', 'parsers.specs', 'parsers.douyin', 'parsers.kuaishou',
+            'parsers.xiaohongshu', 'parsers.bilibili']
+print(json.dumps({'elapsed_ms': elapsed, 'loaded': [name for name in deferred if name in sys.modules]}))
+"""
+
+
+def measure():
+    output = subprocess.run([sys.executable, '-c', MEASURE], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+def test_heavy_modules_deferred_until_first_use():
+    assert measure()['loaded'] == []
+
+
+def test_cold_start_within_budget():
+    budget = float(os.environ.get('STARTUP_BUDGET_MS', '200'))
+    elapsed = min(measure()['elapsed_ms'] for _ in range(3))
+    assert elapsed <= budget, f"导入 main 耗时 {elapsed:.1f}ms，超过启动预算 {budget:.0f}ms"
+
+
+def test_parser_created_on_first_use():
+    import main
+
+    parser = main.get_parser('kuaishou')
+    assert main.get_parser('kuaishou') is parser
+    assert main.parsers['kuaishou'] is parser
+    assert main.get_parser('unknown') is None
@@ -0,0 +1,79 @@
+import json
+
+from parsers.bilibili import BilibiliParser
+from parsers.kuaishou import KuaishouParser
+from parsers.models import BilibiliFallback, BilibiliResult, DouyinFallback, KuaishouFallback, KuaishouResult
+from parsers.strategy import StrategyChain
+
+
+def test_chain_moves_working_strategy_first():
+    calls = []
+
+    def broken(html):
+        calls.append("broken")
+        return None
+
+    def working(html):
+        calls.append("working")
+        return DouyinFallback(video_url=html)
+
+    chain = StrategyChain()
+    chain.register("broken", broken)
+    chain.register("working", working)
+
+    assert chain.run("a") == DouyinFallback(video_url="a")
+    assert chain.order() == ["working", "broken"]
+
+    calls.clear()
+    assert chain.run("b") == DouyinFallback(video_url="b")
+    assert calls == ["working"]
+
+
+def test_chain_counts_exceptions_as_failures():
+    def raising(html):
+        raise ValueError(html)
+
+    chain = StrategyChain()
+    chain.register("raising", raising)
+    assert chain.run("x") is None
+    stats = chain.stats()[0]
+    assert stats["attempts"] == 1
+    assert stats["successes"] == 0
+
+
+def test_kuaishou_falls_back_to_src_no_mark():
+    parser = KuaishouParser()
+    html = '<title>标题</title><script>{"srcNoMark":"https://v.kwaicdn.com/a.mp4"}</script>'
+    result = parser.strategies.run(html)
+    assert result == KuaishouFallback(video_url="https://v.kwaicdn.com/a.mp4", caption="标题")
+    assert parser.strategies.order()[-1] == "src_no_mark"
+
+
+def test_fallback_stays_behind_full_extractors():
+    chain = StrategyChain()
+    chain.register("fast_fallback", lambda html: DouyinFallback(video_url="partial"), fallback=True)
+    chain.register("full", lambda html: DouyinFallback(video_url="full") if html == "good" else None)
+
+    for _ in range(5):
+        assert chain.run("bad") == DouyinFallback(video_url="partial")
+    assert chain.order() == ["full", "fast_fallback"]
+    assert chain.run("good") == DouyinFallback(video_url="full")
+
+
+def test_one_bad_page_does_not_demote_full_result():
+    parser = BilibiliParser()
+    bad = '<meta property="og:title" content="只有标题">'
+    assert parser.extract(bad) == BilibiliFallback(title="只有标题")
+
+    good = "<script>window.__INITIAL_STATE__=" + json.dumps({"videoData": {
+        "bvid": "BV1xx", "title": "完整", "pages": [{"cid": 1}],
+    }}) + ";</script>" + bad
+    result = parser.extract(good)
+    assert isinstance(result, BilibiliResult)
+    assert result.title == "完整"
+    assert parser.strategies.order() == ["initial_state", "og_title"]
+
+    kuaishou = KuaishouParser()
+    kuaishou.extract('<script>{"srcNoMark":"https://v.kwaicdn.com/a.mp4"}</script>')
+    page = "<script>window.pageData=" + json.dumps({"video": {"photoId": "p1"}}) + ';</script>{"srcNoMark":"x"}'
+    assert isinstance(kuaishou.extract(page), KuaishouResult)
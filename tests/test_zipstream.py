@@ -0,0 +1,55 @@
+import asyncio
+import io
+import zipfile
+
+from parsers.xiaohongshu import XiaohongshuParser
+from zipstream import stream_zip
+
+
+async def _chunks(value, fail=False):
+    for _ in range(3):
+        await asyncio.sleep(0)
+        yield bytes([value]) * 1000
+    if fail:
+        raise RuntimeError("connection reset")
+
+
+def _collect(entries, window):
+    async def run():
+        body = b""
+        async for chunk in stream_zip(entries, window=window):
+            body += chunk
+        return body
+
+    return zipfile.ZipFile(io.BytesIO(asyncio.run(run())))
+
+
+def test_stream_zip_keeps_entry_order():
+    entries = [(f"{i:02d}.jpg", lambda i=i: _chunks(i)) for i in range(6)]
+    archive = _collect(entries, window=2)
+    assert archive.namelist() == [name for name, _ in entries]
+    assert archive.testzip() is None
+    assert archive.read("03.jpg") == bytes([3]) * 3000
+
+
+def test_stream_zip_descriptor_entries_are_deflated():
+    # 流式解压器只接受带 data descriptor（标志位 3）的 DEFLATED 条目
+    entries = [("01.jpg", lambda: _chunks(1)), ("02.jpg", lambda: _chunks(2, fail=True))]
+    archive = _collect(entries, window=2)
+    for info in archive.infolist():
+        assert info.flag_bits & 0x08
+        assert info.compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_stream_zip_reports_failed_entries():
+    entries = [
+        ("01.jpg", lambda: _chunks(1)),
+        ("02.jpg", lambda: _chunks(2, fail=True)),
+    ]
+    archive = _collect(entries, window=2)
+    assert archive.read("errors.txt") == b"02.jpg: connection reset"
+
+
+def test_image_filename():
+    assert XiaohongshuParser.image_filename(1, "http://sns-webpic-qc.xhscdn.com/abc!nd_dft_wlteh_webp_3") == "01.webp"
+    assert XiaohongshuParser.image_filename(12, "http://sns-webpic-qc.xhscdn.com/abc") == "12.jpg"
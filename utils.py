@@ -7,11 +7,14 @@ class UrlUtils:
     @staticmethod
     def extract_video_id(url: str, platform: str) -> Optional[str]:
         if platform == "xiaohongshu":
-            match = re.search(r'/explore/([a-zA-Z0-9]+)', url)
+            match = re.search(r'/(?:explore|discovery/item)/([a-zA-Z0-9]+)', url)
             return match.group(1) if match else None
         
         elif platform == "douyin":
             match = re.search(r'/video/(\d+)', url)
+            if match:
+                return match.group(1)
+            match = re.search(r'modal_id=(\d+)', url)
             return match.group(1) if match else None
         
         elif platform == "bilibili":
@@ -0,0 +1,98 @@
+import asyncio
+import io
+import logging
+import zipfile
+from typing import AsyncIterator, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+ChunkSource = Callable[[], AsyncIterator[bytes]]
+
+_DONE = object()
+
+
+class _ZipSink(io.RawIOBase):
+    # 不可 seek 的输出，zipfile 会改用 data descriptor 写入，归档可以边生成边发送
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _pump(source: ChunkSource, queue: asyncio.Queue) -> None:
+    try:
+        async for chunk in source():
+            await queue.put(chunk)
+    except Exception as e:
+        await queue.put(e)
+    await queue.put(_DONE)
+
+
+async def stream_zip(
+    entries: List[Tuple[str, ChunkSource]],
+    window: int = 4,
+    queue_chunks: int = 8,
+    compresslevel: int = 1,
+) -> AsyncIterator[bytes]:
+    # 同时最多下载 window 个条目，每个条目最多缓冲 queue_chunks 个分块；
+    # 按顺序写入归档，写完一个再启动下一个下载，内存占用与条目数量无关
+    sink = _ZipSink()
+    # 带 data descriptor 的条目必须是 DEFLATED，STORED 条目会被流式解压（如 Java/Android 的 ZipInputStream）拒绝；
+    # 图片本身已压缩，用最低压缩级别，额外开销很小
+    archive = zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+    queues = [asyncio.Queue(maxsize=queue_chunks) for _ in entries]
+    tasks: List[asyncio.Task] = []
+    failed: List[str] = []
+
+    def start(index: int) -> None:
+        if index < len(entries):
+            tasks.append(asyncio.create_task(_pump(entries[index][1], queues[index])))
+
+    try:
+        for index in range(min(window, len(entries))):
+            start(index)
+
+        for index, (name, _) in enumerate(entries):
+            queue = queues[index]
+            entry = None
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    logger.warning(f"打包下载失败 {name}: {str(item)}")
+                    failed.append(f"{name}: {str(item)}")
+                    continue
+                if entry is None:
+                    entry = archive.open(name, mode='w')
+                entry.write(item)
+                data = sink.drain()
+                if data:
+                    yield data
+            if entry is not None:
+                entry.close()
+            start(index + window)
+
+        if failed:
+            archive.writestr('errors.txt', '\n'.join(failed))
+        archive.close()
+        yield sink.drain()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)